@@ -0,0 +1,14 @@
+"""Load benchmarks for the gym app.
+
+Run from the project root, e.g.::
+
+    python -m benchmarks.generate --members 5000 --years 2
+    python -m benchmarks.run --concurrency 8 --requests 200 --output bench.json
+"""
+import os
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gymapp.settings')
+    import django
+    django.setup()
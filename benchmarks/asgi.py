@@ -0,0 +1,83 @@
+"""Compare requests per process: sync WSGI workers against ASGI.
+
+Starts one gunicorn process with a single sync worker, then one with a
+single uvicorn worker (``pip install uvicorn``), and drives the read-heavy
+pages at the same concurrency against each.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from .run import HttpRunner, run_url
+
+READ_PATHS = {
+    'home': '/',
+    'class_schedule': '/classes/',
+    'instructors': '/instructors/',
+    'gym_info': '/info/',
+}
+SERVERS = {
+    'wsgi': ['gymapp.wsgi:application', '--worker-class', 'sync'],
+    'asgi': ['gymapp.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per URL.')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    return parser.parse_args(argv)
+
+
+def wait_until_up(url, process, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            urllib.request.urlopen(url).close()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f'server at {url} did not start')
+
+
+def bench_server(name, args):
+    base_url = f'http://127.0.0.1:{args.port}'
+    command = [
+        sys.executable, '-m', 'gunicorn', *SERVERS[name],
+        '--workers', '1', '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning',
+    ]
+    process = subprocess.Popen(command, env=dict(os.environ))
+    try:
+        wait_until_up(base_url + '/', process)
+        runner = HttpRunner(base_url)
+        return {url_name: run_url(runner, path, args) for url_name, path in READ_PATHS.items()}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {name: bench_server(name, args) for name in SERVERS}
+    for url_name in READ_PATHS:
+        wsgi, asgi = results['wsgi'][url_name], results['asgi'][url_name]
+        print(f"{url_name:16} wsgi {wsgi['throughput_rps']:8.1f} req/s p99 {wsgi['p99_ms']:8.2f}ms   "
+              f"asgi {asgi['throughput_rps']:8.1f} req/s p99 {asgi['p99_ms']:8.2f}ms")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'concurrency': args.concurrency, 'results': results}, fh, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Compare check-in throughput: the classic view against the buffered path.
+
+Each worker thread logs in as its own member and posts check-ins as fast
+as it can, first to ``check_in`` (one INSERT, redirect and session write
+per request), then to ``quick_check_in`` (journal append, batched INSERT).
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import setup_django
+
+USER_PREFIX = 'bench-checkin-'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checkins', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    return parser.parse_args(argv)
+
+
+def bench_users(count):
+    from django.contrib.auth.models import User
+
+    from gym.models import Member
+
+    users = []
+    for i in range(count):
+        user, _ = User.objects.get_or_create(username=f'{USER_PREFIX}{i}')
+        Member.objects.get_or_create(user=user, defaults={
+            'first_name': 'Checkin', 'last_name': str(i),
+            'email': f'{USER_PREFIX}{i}@bench.example.com', 'phone': '555-0000',
+        })
+        users.append(user)
+    return users
+
+
+def run_path(url_name, users, total):
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    path = reverse(url_name)
+    local = threading.local()
+    errors = []
+
+    def post(index):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+            local.client.force_login(users[index % len(users)])
+        try:
+            status = local.client.post(path).status_code
+        except Exception as exc:
+            errors.append(repr(exc))
+            return
+        finally:
+            connection.close()
+        if status >= 400:
+            errors.append(status)
+
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        started = time.perf_counter()
+        list(pool.map(post, range(total)))
+        elapsed = time.perf_counter() - started
+    return {
+        'checkins': total,
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'checkins_per_second': round(total / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django()
+    from gym import checkins
+    from gym.models import Attendance
+
+    users = bench_users(args.concurrency)
+    results = {'check_in': run_path('check_in', users, args.checkins)}
+
+    before = Attendance.objects.count()
+    results['quick_check_in'] = run_path('quick_check_in', users, args.checkins)
+    started = time.perf_counter()
+    checkins.get_buffer().flush()
+    results['quick_check_in']['final_flush_seconds'] = round(time.perf_counter() - started, 3)
+    results['quick_check_in']['rows_written'] = Attendance.objects.count() - before
+
+    for name, row in results.items():
+        print(f"{name:16} {row['checkins_per_second']:8.1f} check-ins/s  errors {row['errors']}")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'concurrency': args.concurrency, 'results': results}, fh, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Deterministic synthetic data generator.
+
+The same arguments and ``--seed`` always produce the same rows, so
+benchmark runs on different commits see identical data.
+"""
+import argparse
+import random
+from datetime import datetime, time, timedelta
+
+from . import setup_django
+
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Smith', 'Johnson', 'Lee', 'Garcia', 'Brown', 'Davis', 'Martinez', 'Chen', 'Wilson', 'Patel']
+SPECIALTIES = ['Yoga', 'HIIT', 'Spin', 'Strength', 'Pilates', 'Boxing', 'Dance', 'Mobility']
+EMAIL_DOMAIN = 'bench.example.com'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=1000)
+    parser.add_argument('--instructors', type=int, default=12)
+    parser.add_argument('--classes', type=int, default=40)
+    parser.add_argument('--registrations', type=float, default=0.6,
+                        help='Average fraction of each class capacity that is booked.')
+    parser.add_argument('--years', type=float, default=1, help='Years of attendance history.')
+    parser.add_argument('--visits-per-week', type=float, default=2)
+    parser.add_argument('--end-date', default='2026-01-01', help='Last day of attendance history.')
+    parser.add_argument('--seed', type=int, default=370)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--flush', action='store_true', help='Delete previously generated rows first.')
+    return parser.parse_args(argv)
+
+
+def flush():
+    from gym.models import GymClass, Instructor, Member
+    Member.objects.filter(email__endswith='@' + EMAIL_DOMAIN).delete()
+    Instructor.objects.filter(email__endswith='@' + EMAIL_DOMAIN).delete()
+    GymClass.objects.filter(description__startswith='[bench]').delete()
+
+
+def generate(args):
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from gym import occurrences, pagecache, rollups, search, stats
+    from gym.models import Attendance, ClassOccurrence, ClassRegistration, GymClass, Instructor, Member
+
+    rng = random.Random(args.seed)
+    end = timezone.make_aware(datetime.fromisoformat(args.end_date))
+    history_days = max(1, int(args.years * 365))
+
+    with transaction.atomic():
+        instructors = Instructor.objects.bulk_create([
+            Instructor(
+                name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}',
+                specialty=rng.choice(SPECIALTIES),
+                bio='Generated for benchmarks.',
+                years_experience=rng.randint(1, 20),
+                email=f'instructor{i}@{EMAIL_DOMAIN}',
+            )
+            for i in range(args.instructors)
+        ])
+
+        classes = GymClass.objects.bulk_create([
+            GymClass(
+                name=f'{rng.choice(SPECIALTIES)} {i}',
+                description='[bench] Generated class.',
+                instructor=rng.choice(instructors) if instructors else None,
+                day_of_week=rng.randrange(7),
+                start_time=time(rng.randint(5, 21), rng.choice([0, 15, 30, 45])),
+                duration_minutes=rng.choice([30, 45, 60, 90]),
+                capacity=rng.randint(10, 40),
+            )
+            for i in range(args.classes)
+        ])
+
+        members = Member.objects.bulk_create([
+            Member(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f'member{i}@{EMAIL_DOMAIN}',
+                phone=f'555-{rng.randint(0, 9999):04d}',
+                membership_type=rng.choice(['basic', 'premium', 'platinum']),
+                date_joined=end - timedelta(days=rng.randint(0, history_days), seconds=rng.randint(0, 86399)),
+            )
+            for i in range(args.members)
+        ], batch_size=args.batch_size)
+
+        # Sessions are dated from today so the schedule pages have rows to
+        # show; their number and bookings still depend only on the seed.
+        occurrences.generate(classes=classes)
+        sessions = ClassOccurrence.objects.filter(gym_class__in=classes).order_by('gym_class_id', 'date')
+        registrations = []
+        for session in sessions:
+            booked = min(len(members), int(session.capacity * min(1.0, args.registrations * rng.uniform(0.5, 1.5))))
+            for member in rng.sample(members, booked):
+                registrations.append(ClassRegistration(member=member, gym_class_id=session.gym_class_id, occurrence=session))
+        ClassRegistration.objects.bulk_create(registrations, batch_size=args.batch_size)
+        sessions.sync_seats_taken()
+
+    visit_probability = args.visits_per_week / 7
+    attendance_rows = 0
+    batch = []
+    for member in members:
+        for day in range(history_days):
+            if rng.random() >= visit_probability:
+                continue
+            check_in = end - timedelta(days=day, hours=rng.randint(0, 17), minutes=rng.randint(0, 59))
+            batch.append(Attendance(
+                member=member,
+                check_in_time=check_in,
+                check_out_time=check_in + timedelta(minutes=rng.randint(30, 120)),
+            ))
+            if len(batch) >= args.batch_size:
+                Attendance.objects.bulk_create(batch)
+                rollups.add_visits(batch)
+                attendance_rows += len(batch)
+                batch = []
+    Attendance.objects.bulk_create(batch)
+    rollups.add_visits(batch)
+    attendance_rows += len(batch)
+
+    for model in (Member, GymClass, Instructor):
+        stats.invalidate(model)
+        pagecache.touch(model)
+    pagecache.touch(ClassOccurrence)
+    if search.enabled():
+        search.rebuild(connection)
+
+    return {
+        'instructors': len(instructors),
+        'classes': len(classes),
+        'members': len(members),
+        'registrations': len(registrations),
+        'attendance': attendance_rows,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django()
+    if args.flush:
+        flush()
+    counts = generate(args)
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Drive every gym URL at a fixed concurrency and record latency.
+
+By default requests go through Django's test client in-process, which also
+lets the harness count SQL queries per request. With ``--base-url`` the
+same URLs are fetched over HTTP from a running server (e.g. gunicorn).
+Results are written as JSON so runs can be compared across commits.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from . import setup_django
+
+# Views that change state, end the session or never finish are not load-tested.
+SKIPPED = {'logout', 'class_cancel', 'class_waitlist', 'quick_check_in', 'class_availability_stream'}
+BENCH_USERNAME = 'bench-user'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=100, help='Requests per URL.')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per URL.')
+    parser.add_argument('--base-url', help='Benchmark a running server instead of the test client.')
+    parser.add_argument('--only', nargs='*', help='Limit the run to these URL names.')
+    parser.add_argument('--anonymous', action='store_true', help='Send test-client requests without logging in.')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_user():
+    from django.contrib.auth.models import User
+
+    from gym.models import Member
+
+    user, created = User.objects.get_or_create(username=BENCH_USERNAME)
+    if created:
+        user.set_password(BENCH_USERNAME)
+        user.save()
+    Member.objects.get_or_create(user=user, defaults={
+        'first_name': 'Bench', 'last_name': 'User', 'email': 'bench-user@bench.example.com', 'phone': '555-0000',
+    })
+    return user
+
+
+def target_urls(only=None):
+    """Resolve every named pattern in gym.urls to a concrete path."""
+    from django.urls import reverse
+
+    from gym import urls
+    from gym.models import ClassOccurrence, GymClass, Member
+
+    sample_pk = {
+        'members': Member.objects.order_by('pk').values_list('pk', flat=True).first(),
+        'classes': GymClass.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True).first(),
+        'sessions': ClassOccurrence.objects.upcoming().order_by('pk').values_list('pk', flat=True).first(),
+    }
+    targets = []
+    for pattern in urls.urlpatterns:
+        name = pattern.name
+        if not name or name in SKIPPED or (only and name not in only):
+            continue
+        kwargs = {}
+        if 'pk' in pattern.pattern.converters:
+            pk = sample_pk.get(str(pattern.pattern).split('/')[0])
+            if pk is None:
+                continue
+            kwargs['pk'] = pk
+        targets.append((name, reverse(name, kwargs=kwargs)))
+    return targets
+
+
+class ClientRunner:
+    def __init__(self, user):
+        self.user = user
+        self.local = threading.local()
+
+    def client(self):
+        if not hasattr(self.local, 'client'):
+            from django.test import Client
+            self.local.client = Client()
+            if self.user is not None:
+                self.local.client.force_login(self.user)
+        return self.local.client
+
+    def __call__(self, path):
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+
+        with ExitStack() as stack:
+            captured = [stack.enter_context(CaptureQueriesContext(conn)) for conn in connections.all()]
+            started = time.perf_counter()
+            response = self.client().get(path)
+            elapsed = time.perf_counter() - started
+        return elapsed, response.status_code, sum(len(queries) for queries in captured)
+
+
+class HttpRunner:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def __call__(self, path):
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(self.base_url + path) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        return time.perf_counter() - started, status, None
+
+
+def run_url(runner, path, args):
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(runner, [path] * args.warmup))
+        started = time.perf_counter()
+        samples = list(pool.map(runner, [path] * args.requests))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+    query_counts = [queries for _, _, queries in samples if queries is not None]
+    return {
+        'path': path,
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 400),
+        'status_codes': sorted({status for _, status, _ in samples}),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'throughput_rps': round(len(samples) / wall, 1) if wall else None,
+        'queries_per_request': round(sum(query_counts) / len(query_counts), 2) if query_counts else None,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django()
+    runner = HttpRunner(args.base_url) if args.base_url else ClientRunner(None if args.anonymous else bench_user())
+
+    results = {}
+    for name, path in target_urls(args.only):
+        results[name] = run_url(runner, path, args)
+        row = results[name]
+        print(f"{name:16} p50 {row['p50_ms']:8.2f}ms  p95 {row['p95_ms']:8.2f}ms  p99 {row['p99_ms']:8.2f}ms  "
+              f"{row['throughput_rps']:8.1f} req/s  queries {row['queries_per_request']}")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'mode': 'http' if args.base_url else 'test-client',
+        'base_url': args.base_url,
+        'anonymous': args.anonymous,
+        'concurrency': args.concurrency,
+        'requests_per_url': args.requests,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,258 @@
+from datetime import datetime, time, timedelta
+
 from django.contrib import admin
-from .models import Member, GymClass, ClassRegistration, Attendance, GymEvent, SpecialHours, Instructor
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import cached_property
+from . import photos, reservations, search
+from .forms import ClassRegistrationAdminForm, InstructorAdminForm
+from .models import Member, GymClass, ClassOccurrence, ClassRegistration, Attendance, GymEvent, SpecialHours, Instructor, HourlyVisits, MemberMonthlyVisits, WaitlistEntry
+
+
+class IndexedSearchMixin:
+    # (lookup, kind) pairs answered from the gym.search index. Any match
+    # counts; search_fields are only used when the index is unavailable.
+    search_index = []
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search.match_expression(search_term) or not search.enabled(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search.filter_q(self.search_index, search_term)), False
+
+
+def estimated_row_count(model, using):
+    """A cheap approximation of the table's row count, or None."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+    # Two primary key lookups (kept apart: SQLite scans the table for MIN
+    # and MAX in one query). Off only by the gaps left by deleted rows.
+    pks = model._default_manager.using(using).values_list('pk', flat=True)
+    first = pks.order_by('pk').first()
+    if first is None:
+        return 0
+    return pks.order_by('-pk').first() - first + 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginate without counting every row.
+
+    An unfiltered list reports the table's estimated size; a filtered one is
+    counted up to ``count_limit`` rows, or to one row past the page after
+    ``requested_page``, which bounds the work per page while every page
+    stays reachable.
+    """
+    count_limit = 10000
+    requested_page = 1
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.count_limit:
+                return estimate
+        limit = max(self.count_limit, (self.requested_page + 1) * self.per_page + 1)
+        return queryset.order_by()[:limit].count()
+
+
+def _next_bucket(day, kind):
+    if kind == 'year':
+        return day.replace(year=day.year + 1)
+    if kind == 'month':
+        return day.replace(year=day.year + day.month // 12, month=day.month % 12 + 1)
+    return day + timedelta(days=1)
+
+
+def _bucket(day, kind):
+    if kind == 'year':
+        return day.replace(month=1, day=1)
+    if kind == 'month':
+        return day.replace(day=1)
+    return day
+
+
+class IndexedDates:
+    """Stands in for ``cl.queryset`` when the admin builds its date hierarchy.
+
+    Django asks for ``MIN`` and ``MAX`` together and for ``SELECT DISTINCT``
+    of the truncated dates, which scan the whole table. Here each bound is
+    one ordered index lookup, and each year, month or day between them is an
+    ``EXISTS`` over an index range.
+    """
+
+    def __init__(self, queryset, field_name):
+        self.queryset = queryset
+        self.field_name = field_name
+        self.is_datetime = isinstance(queryset.model._meta.get_field(field_name), models.DateTimeField)
+
+    @cached_property
+    def bounds(self):
+        values = self.queryset.filter(**{f'{self.field_name}__isnull': False}).values_list(self.field_name, flat=True)
+        first = values.order_by(self.field_name).first()
+        last = values.order_by(f'-{self.field_name}').first()
+        return {'first': first, 'last': last}
+
+    def aggregate(self, **aggregates):
+        return self.bounds
+
+    def _local_date(self, value):
+        return timezone.localtime(value).date() if self.is_datetime and timezone.is_aware(value) else value
+
+    def _lower_bound(self, day):
+        if self.is_datetime:
+            return timezone.make_aware(datetime.combine(day, time.min))
+        return day
+
+    def _in_range(self, field_name, start, end):
+        # SQLite seeks the index on the first range given for a column, so
+        # the bucket's range has to come before the changelist's own filters.
+        rows = self.queryset.model._default_manager.db_manager(self.queryset.db).filter(**{
+            f'{field_name}__gte': self._lower_bound(start), f'{field_name}__lt': self._lower_bound(end),
+        })
+        if self.queryset.query.distinct:
+            rows = rows.distinct()
+        return rows & self.queryset
+
+    def dates(self, field_name, kind):
+        if self.bounds['first'] is None:
+            return []
+        first = _bucket(self._local_date(self.bounds['first']), kind)
+        last = _bucket(self._local_date(self.bounds['last']), kind)
+        # The buckets holding the bounds are known to have rows.
+        found = [first]
+        day = _next_bucket(first, kind)
+        while day < last:
+            end = _next_bucket(day, kind)
+            if self._in_range(field_name, day, end).exists():
+                found.append(day)
+            day = end
+        if last != first:
+            found.append(last)
+        return found
+
+    datetimes = dates
+
+
+class LargeTableAdminMixin:
+    # For tables with millions of rows: no COUNT(*) per page, and no second
+    # count of the unfiltered table when a filter is applied. Subclasses
+    # should also set list_select_related for every related object shown,
+    # including those __str__ uses, raw_id_fields or autocomplete_fields
+    # for foreign keys, and a date_hierarchy on an indexed column, which
+    # the template draws from IndexedDates.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/gym/large_change_list.html'
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        paginator = super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        try:
+            paginator.requested_page = max(1, int(request.GET.get(PAGE_VAR, 1)))
+        except ValueError:
+            pass
+        return paginator
 
 
 @admin.register(Member)
-class MemberAdmin(admin.ModelAdmin):
+class MemberAdmin(LargeTableAdminMixin, IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['first_name', 'last_name', 'email', 'membership_type', 'date_joined', 'is_active']
-    list_filter = ['membership_type', 'is_active', 'date_joined']
+    list_filter = ['membership_type', 'is_active']
     search_fields = ['first_name', 'last_name', 'email']
+    search_index = [('pk', 'member')]
+    date_hierarchy = 'date_joined'
+    raw_id_fields = ['user']
 
 
 @admin.register(GymClass)
-class GymClassAdmin(admin.ModelAdmin):
+class GymClassAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'instructor', 'day_of_week', 'start_time', 'capacity', 'is_active']
     list_filter = ['day_of_week', 'is_active']
-    search_fields = ['name', 'instructor']
+    list_select_related = ['instructor']
+    search_fields = ['name', 'instructor__name']
+    search_index = [('pk', 'class'), ('instructor', 'instructor')]
+
+
+@admin.register(ClassOccurrence)
+class ClassOccurrenceAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ['gym_class', 'date', 'start_time', 'capacity', 'seats_taken', 'waitlist_length', 'is_cancelled']
+    list_filter = ['is_cancelled', 'gym_class']
+    list_select_related = ['gym_class']
+    date_hierarchy = 'date'
+    search_fields = ['gym_class__name']
+    search_index = [('gym_class', 'class')]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'capacity' in form.changed_data or 'is_cancelled' in form.changed_data:
+            reservations.fill_free_seats(obj)
 
 
 @admin.register(ClassRegistration)
-class ClassRegistrationAdmin(admin.ModelAdmin):
-    list_display = ['member', 'gym_class', 'registered_at', 'is_cancelled', 'attended']
-    list_filter = ['is_cancelled', 'attended', 'registered_at']
+class ClassRegistrationAdmin(LargeTableAdminMixin, IndexedSearchMixin, admin.ModelAdmin):
+    form = ClassRegistrationAdminForm
+    list_display = ['member', 'occurrence', 'registered_at', 'is_cancelled', 'attended']
+    list_filter = ['is_cancelled', 'attended']
+    # __str__ (rendered in each row's action checkbox) uses gym_class.
+    list_select_related = ['member', 'gym_class', 'occurrence__gym_class']
+    raw_id_fields = ['member', 'occurrence']
+    autocomplete_fields = ['gym_class']
+    date_hierarchy = 'registered_at'
     search_fields = ['member__first_name', 'member__last_name', 'gym_class__name']
+    search_index = [('member', 'member'), ('gym_class', 'class')]
+
+    def save_model(self, request, obj, form, change):
+        if obj.occurrence_id:
+            obj.gym_class_id = obj.occurrence.gym_class_id
+        occurrence_ids = {obj.occurrence_id, form.initial.get('occurrence')} - {None}
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            occurrences = ClassOccurrence.objects.filter(pk__in=occurrence_ids)
+            occurrences.sync_seats_taken()
+            # The form checked for a free seat; this catches a concurrent booking.
+            if occurrences.filter(seats_taken__gt=F('capacity')).exists():
+                raise reservations.ClassFull(obj.occurrence)
+            for occurrence in occurrences:
+                reservations.fill_free_seats(occurrence)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ['occurrence', 'position', 'member', 'joined_at']
+    list_select_related = ['member', 'occurrence__gym_class']
+    search_fields = ['member__first_name', 'member__last_name', 'occurrence__gym_class__name']
+    search_index = [('member', 'member'), ('occurrence__gym_class', 'class')]
+
+    # Entries are managed through reservations so positions stay contiguous.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def delete_model(self, request, obj):
+        reservations.leave_waitlist(obj.member, obj.occurrence)
+
+    def delete_queryset(self, request, queryset):
+        for entry in queryset.select_related('member', 'occurrence'):
+            reservations.leave_waitlist(entry.member, entry.occurrence)
 
 
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
+class AttendanceAdmin(LargeTableAdminMixin, IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['member', 'check_in_time', 'check_out_time']
-    list_filter = ['check_in_time']
+    list_select_related = ['member']
+    raw_id_fields = ['member']
+    date_hierarchy = 'check_in_time'
     search_fields = ['member__first_name', 'member__last_name']
+    search_index = [('member', 'member')]
 
 
 @admin.register(GymEvent)
@@ -45,6 +270,28 @@ class SpecialHoursAdmin(admin.ModelAdmin):
 
 
 @admin.register(Instructor)
-class InstructorAdmin(admin.ModelAdmin):
+class InstructorAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    form = InstructorAdminForm
     list_display = ['name', 'specialty', 'years_experience', 'email']
     search_fields = ['name', 'specialty']
+    search_index = [('pk', 'instructor')]
+
+    def save_model(self, request, obj, form, change):
+        upload = form.cleaned_data.get('photo_upload')
+        if upload:
+            obj.photo = default_storage.save(f'{photos.UPLOAD_DIR}/{upload.name}', upload)
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(HourlyVisits)
+class HourlyVisitsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'hour', 'visits']
+    date_hierarchy = 'date'
+
+
+@admin.register(MemberMonthlyVisits)
+class MemberMonthlyVisitsAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ['member', 'month', 'visits']
+    list_select_related = ['member']
+    raw_id_fields = ['member']
+    date_hierarchy = 'month'
@@ -0,0 +1,140 @@
+"""Read-only JSON API for classes, their sessions, events, special hours and instructors.
+
+Rows are serialized straight from ``.values()``. Each response carries a
+strong ETag derived from the change versions kept by ``gym.pagecache``,
+so a poll with a matching ``If-None-Match`` is answered with a 304 before
+any query runs. The staff-only search autocomplete is the exception: it is
+never cached and answers from ``gym.search``. So is a member's attendance
+history, which only staff and the member can read and which includes
+archived check-ins with ``?archived=1``.
+"""
+import hashlib
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from . import archive, search
+from .db import read_only_view
+from .models import ClassOccurrence, GymClass, GymEvent, Instructor, SpecialHours
+from .pagecache import model_versions
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def versioned_json(*models):
+    """Serve a view's dict as compact JSON with an ETag tied to ``models``."""
+    def decorator(view_func):
+        @require_safe
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            fingerprint = f'{request.get_full_path()}|{timezone.localdate()}|{model_versions(models)}'
+            etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is None:
+                response = JsonResponse(
+                    view_func(request, *args, **kwargs),
+                    encoder=DjangoJSONEncoder,
+                    json_dumps_params={'separators': (',', ':')},
+                )
+            else:
+                response = not_modified
+            response['ETag'] = etag
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def paginate(request, queryset):
+    """Slice ``queryset`` by ``?page=`` without a COUNT, fetching one extra row to detect a next page."""
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+        page_size = max(1, min(int(request.GET.get('page_size', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        page, page_size = 1, DEFAULT_PAGE_SIZE
+    offset = (page - 1) * page_size
+    rows = list(queryset[offset:offset + page_size + 1])
+
+    next_page = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        params = request.GET.copy()
+        params['page'] = page + 1
+        params['page_size'] = page_size
+        next_page = f'{request.path}?{params.urlencode()}'
+    return {'results': rows, 'next': next_page}
+
+
+@versioned_json(GymClass, Instructor)
+def classes(request):
+    rows = GymClass.objects.filter(is_active=True).values(
+        'id', 'name', 'instructor_id', 'day_of_week', 'start_time', 'duration_minutes', 'capacity',
+        instructor_name=F('instructor__name'),
+    )
+    return paginate(request, rows)
+
+
+@versioned_json(ClassOccurrence, GymClass, Instructor)
+def schedule(request):
+    rows = ClassOccurrence.objects.upcoming().filter(gym_class__is_active=True).values(
+        'id', 'gym_class_id', 'date', 'start_time', 'capacity', 'seats_taken', 'waitlist_length',
+        name=F('gym_class__name'),
+        instructor_name=F('gym_class__instructor__name'),
+        duration_minutes=F('gym_class__duration_minutes'),
+    )
+    return paginate(request, rows)
+
+
+@versioned_json(GymEvent)
+def events(request):
+    rows = GymEvent.objects.filter(date__gte=timezone.localdate(), is_active=True).values(
+        'id', 'title', 'description', 'event_type', 'date', 'start_time', 'end_time',
+    )
+    return paginate(request, rows)
+
+
+@versioned_json(SpecialHours)
+def special_hours(request):
+    rows = SpecialHours.objects.filter(date__gte=timezone.localdate()).values(
+        'id', 'date', 'closure_type', 'title', 'is_closed', 'open_time', 'close_time',
+    )
+    return paginate(request, rows)
+
+
+@versioned_json(Instructor)
+def instructors(request):
+    rows = Instructor.objects.values(
+        'id', 'name', 'specialty', 'bio', 'years_experience', 'certifications', 'photo',
+    )
+    return paginate(request, rows)
+
+
+@require_safe
+@never_cache
+@read_only_view
+def search_autocomplete(request):
+    """Prefix matches for the front desk; ``?q=`` is what has been typed so far."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only.'}, status=403)
+    kinds = request.GET.get('kinds')
+    results = search.autocomplete(request.GET.get('q', ''), kinds.split(',') if kinds else None)
+    return JsonResponse({'results': results}, json_dumps_params={'separators': (',', ':')})
+
+
+@require_safe
+@never_cache
+@read_only_view
+def member_attendance(request, pk):
+    """A member's check-ins, newest first; ``?archived=1`` adds the archive."""
+    if not (request.user.is_staff or (request.member is not None and request.member.pk == pk)):
+        return JsonResponse({'error': 'Not allowed.'}, status=403)
+    rows = archive.history(pk, archived=request.GET.get('archived') == '1')
+    return JsonResponse(paginate(request, rows), encoder=DjangoJSONEncoder, json_dumps_params={'separators': (',', ':')})
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GymConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gym'
+
+    def ready(self):
+        from . import checks, db, signals  # noqa: F401
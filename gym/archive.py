@@ -0,0 +1,79 @@
+"""Attendance retention: old check-ins move to ``ArchivedAttendance``.
+
+``archive(cutoff)`` moves every check-in before ``cutoff`` in batches of
+``GYM_ARCHIVE_BATCH_SIZE``. Each batch is one short transaction that copies
+the rows, keeping their ids, and deletes them from ``Attendance``, so the
+write lock is never held for long and an interrupted run simply resumes.
+The delete is plain SQL: the ``post_delete`` signal would take the visits
+back out of the rollups, and archived check-ins still count.
+``manage.py archive_attendance`` runs it for ``GYM_ATTENDANCE_RETENTION_DAYS``.
+
+``history(member)`` reads a member's check-ins, including the archive when
+asked.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedAttendance, Attendance
+
+FIELDS = ['id', 'member_id', 'check_in_time', 'check_out_time']
+
+
+def default_cutoff():
+    return timezone.now() - timedelta(days=settings.GYM_ATTENDANCE_RETENTION_DAYS)
+
+
+def _move(ids):
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field) for field in FIELDS)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(ArchivedAttendance._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {quote(Attendance._meta.db_table)} WHERE id IN ({placeholders})',
+            ids,
+        )
+        cursor.execute(f'DELETE FROM {quote(Attendance._meta.db_table)} WHERE id IN ({placeholders})', ids)
+
+
+def archive(cutoff=None, batch_size=None, pause=0, progress=None):
+    """Move check-ins before ``cutoff`` to the archive; returns how many moved.
+
+    ``pause`` seconds between batches leave room for other writers.
+    ``progress`` is called with the running total after each batch.
+    """
+    cutoff = cutoff or default_cutoff()
+    batch_size = batch_size or settings.GYM_ARCHIVE_BATCH_SIZE
+    old = Attendance.objects.filter(check_in_time__lt=cutoff).order_by('check_in_time').values_list('pk', flat=True)
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            ids = list(old[:batch_size])
+            if ids:
+                _move(ids)
+        if not ids:
+            return moved
+        moved += len(ids)
+        if progress:
+            progress(moved)
+        if len(ids) < batch_size:
+            return moved
+        if pause:
+            time.sleep(pause)
+
+
+def history(member, archived=False):
+    """``member``'s check-ins newest first, as dicts of ``FIELDS``.
+
+    Only ``Attendance`` is read unless ``archived`` is true, in which case
+    the archive is added with a ``UNION ALL``. The result can be sliced.
+    """
+    rows = Attendance.objects.filter(member=member).order_by().values(*FIELDS)
+    if archived:
+        rows = rows.union(ArchivedAttendance.objects.filter(member=member).order_by().values(*FIELDS), all=True)
+    return rows.order_by('-check_in_time', '-id')
@@ -0,0 +1,149 @@
+"""Async versions of the read-heavy views, used when served through ASGI.
+
+Independent queries are awaited together with ``asyncio.gather``. Django
+still runs each ORM call on its sync thread, so the win is that a worker
+keeps serving other requests while one waits on the database rather than
+parallel SQL. Templates are rendered off the event loop because the
+``auth`` and ``messages`` context processors load the session lazily.
+"""
+import asyncio
+import calendar
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import aget_object_or_404, render
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+
+from . import calendars, live, stats
+from .db import read_only_view
+from .models import ClassOccurrence, GymClass, GymEvent, Instructor, Member, SpecialHours
+from .pagecache import anonymous_page_cache
+from .views import (
+    REGULAR_HOURS, UPCOMING_SESSIONS, _event_stream_response, _session_registrations, _upcoming_registrations,
+    _week_sessions,
+)
+
+arender = sync_to_async(render)
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+@anonymous_page_cache(Member, GymClass)
+@read_only_view
+async def home(request):
+    total_members, total_classes, recent_members = await asyncio.gather(
+        stats.aactive_member_count(),
+        stats.aactive_class_count(),
+        stats.arecent_members(),
+    )
+    return await arender(request, 'gym/home.html', {
+        'total_members': total_members,
+        'total_classes': total_classes,
+        'recent_members': recent_members,
+    })
+
+
+@anonymous_page_cache(GymClass, Instructor, ClassOccurrence)
+@read_only_view
+async def class_schedule(request):
+    sessions = await _alist(_week_sessions(timezone.localdate()))
+    return await arender(request, 'gym/class_schedule.html', {'sessions': sessions})
+
+
+@read_only_view
+async def class_detail(request, pk):
+    gym_class, sessions = await asyncio.gather(
+        aget_object_or_404(GymClass.objects.select_related('instructor'), pk=pk),
+        _alist(ClassOccurrence.objects.upcoming().filter(gym_class_id=pk)[:UPCOMING_SESSIONS]),
+    )
+    next_session = sessions[0] if sessions else None
+    registrations = await _alist(_session_registrations(next_session))
+    return await arender(request, 'gym/class_detail.html', {
+        'gym_class': gym_class,
+        'sessions': sessions,
+        'next_session': next_session,
+        'registrations': registrations,
+    })
+
+
+@anonymous_page_cache(Instructor)
+@read_only_view
+async def instructors(request):
+    instructors_list = await _alist(Instructor.objects.all())
+    return await arender(request, 'gym/instructors.html', {'instructors': instructors_list})
+
+
+@anonymous_page_cache(GymEvent, SpecialHours)
+@read_only_view
+async def gym_info(request):
+    today = date.today()
+    year, month = calendars.parse_month(request.GET, today)
+    prev_month, next_month = calendars.adjacent_months(year, month)
+    
+    upcoming_events, special_hours, calendar_weeks = await asyncio.gather(
+        _alist(GymEvent.objects.filter(date__gte=today, is_active=True)[:10]),
+        _alist(SpecialHours.objects.filter(date__gte=today)[:10]),
+        calendars.aget_month(year, month, today),
+    )
+    
+    return await arender(request, 'gym/gym_info.html', {
+        'upcoming_events': upcoming_events,
+        'special_hours': special_hours,
+        'calendar_weeks': calendar_weeks,
+        'month_name': calendar.month_name[month],
+        'year': year,
+        'prev_month': prev_month,
+        'next_month': next_month,
+        'is_current_month': (year, month) == (today.year, today.month),
+        'regular_hours': REGULAR_HOURS,
+    })
+
+
+@login_required
+async def dashboard(request):
+    member = request.member
+    
+    if member:
+        classes, registrations, recent_checkins = await asyncio.gather(
+            stats.adashboard_classes(),
+            _alist(_upcoming_registrations(member)[:5]),
+            _alist(member.attendance_records.all()[:5]),
+        )
+    else:
+        classes = await stats.adashboard_classes()
+        registrations = []
+        recent_checkins = []
+    
+    return await arender(request, 'gym/dashboard.html', {
+        'member': member,
+        'classes': classes,
+        'registrations': registrations,
+        'recent_checkins': recent_checkins,
+    })
+
+
+@require_safe
+async def class_availability_stream(request):
+    class_ids = live.parse_class_ids(request.GET.get('sessions', ''))
+
+    async def events():
+        subscription = live.broadcaster.subscribe(live.Subscription(class_ids, loop=asyncio.get_running_loop()))
+        try:
+            yield live.stream_preamble()
+            for payload in (await sync_to_async(live.availability)(class_ids)).values():
+                yield live.format_event(payload)
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscription.aqueue.get(), live.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield live.KEEPALIVE
+                else:
+                    yield live.format_event(payload)
+        finally:
+            live.broadcaster.unsubscribe(subscription)
+
+    return _event_stream_response(events())
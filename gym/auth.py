@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .models import Member
+
+UserModel = get_user_model()
+
+
+class MemberModelBackend(ModelBackend):
+    """ModelBackend that loads the user's ``Member`` in the same query."""
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('member').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await UserModel._default_manager.select_related('member').aget(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+def get_member(user):
+    """Return ``user``'s Member, or None for anonymous users and staff without one."""
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.member
+    except Member.DoesNotExist:
+        return None
+
+
+async def aget_member(user):
+    """Async ``get_member``; queries only if the member was not loaded with the user."""
+    if not user.is_authenticated:
+        return None
+    if not UserModel.member.related.is_cached(user):
+        return await Member.objects.filter(user=user).afirst()
+    try:
+        return user.member
+    except Member.DoesNotExist:
+        return None
@@ -0,0 +1,120 @@
+import asyncio
+import calendar
+from collections import defaultdict
+from datetime import MAXYEAR, MINYEAR, date, timedelta
+
+from django.core.cache import cache
+
+from .models import GymEvent, SpecialHours
+
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def month_cache_key(year, month):
+    return f'gym:calendar:{year}-{month:02d}'
+
+
+def parse_month(params, today):
+    try:
+        year = int(params.get('year', today.year))
+        month = int(params.get('month', today.month))
+    except (TypeError, ValueError):
+        return today.year, today.month
+    if not (MINYEAR < year < MAXYEAR and 1 <= month <= 12):
+        return today.year, today.month
+    return year, month
+
+
+def adjacent_months(year, month):
+    first = date(year, month, 1)
+    prev_month = (first - timedelta(days=1)).replace(day=1)
+    next_month = (first + timedelta(days=31)).replace(day=1)
+    return prev_month, next_month
+
+
+def _visible_range(year, month):
+    weeks = calendar.Calendar(firstweekday=6).monthdatescalendar(year, month)
+    return weeks, weeks[0][0], weeks[-1][-1]
+
+
+def _events_in(start, end):
+    return GymEvent.objects.filter(date__range=(start, end), is_active=True)
+
+
+def _special_hours_in(start, end):
+    return SpecialHours.objects.filter(date__range=(start, end)).order_by('date', 'pk')
+
+
+def _grid(weeks, month, event_rows, special_rows):
+    events = defaultdict(list)
+    for event in event_rows:
+        events[event.date].append(event)
+
+    special = {}
+    for hours in special_rows:
+        special.setdefault(hours.date, hours)
+
+    return [
+        [
+            {
+                'date': day,
+                'is_current_month': day.month == month,
+                'events': events.get(day, []),
+                'special': special.get(day),
+            }
+            for day in week
+        ]
+        for week in weeks
+    ]
+
+
+def _mark_today(weeks, today):
+    return [[dict(day, is_today=day['date'] == today) for day in week] for week in weeks]
+
+
+def build_month(year, month):
+    weeks, start, end = _visible_range(year, month)
+    return _grid(weeks, month, _events_in(start, end), _special_hours_in(start, end))
+
+
+async def abuild_month(year, month):
+    weeks, start, end = _visible_range(year, month)
+    events, special = await asyncio.gather(
+        _alist(_events_in(start, end)),
+        _alist(_special_hours_in(start, end)),
+    )
+    return _grid(weeks, month, events, special)
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+def get_month(year, month, today):
+    key = month_cache_key(year, month)
+    weeks = cache.get(key)
+    if weeks is None:
+        weeks = build_month(year, month)
+        cache.set(key, weeks, CALENDAR_CACHE_TIMEOUT)
+    return _mark_today(weeks, today)
+
+
+async def aget_month(year, month, today):
+    key = month_cache_key(year, month)
+    weeks = await cache.aget(key)
+    if weeks is None:
+        weeks = await abuild_month(year, month)
+        await cache.aset(key, weeks, CALENDAR_CACHE_TIMEOUT)
+    return _mark_today(weeks, today)
+
+
+def invalidate_date(day):
+    # A month grid shows up to a week of the neighbouring months, so a change
+    # on any day may be visible in three cached grids.
+    if day is None:
+        return
+    year, month = day.year, day.month
+    if not MINYEAR < year < MAXYEAR:
+        return
+    months = [date(year, month, 1), *adjacent_months(year, month)]
+    cache.delete_many([month_cache_key(m.year, m.month) for m in months])
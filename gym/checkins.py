@@ -0,0 +1,212 @@
+"""Buffered check-in ingestion.
+
+Check-ins are acknowledged once they are appended (and fsynced) to a
+per-process journal, then written to the database in batches by a
+background thread when the buffer reaches ``GYM_CHECKIN_BATCH_SIZE`` or
+every ``GYM_CHECKIN_FLUSH_INTERVAL`` seconds. Journals left behind by a
+crashed process are replayed by the next process that starts a buffer, or
+by ``manage.py flush_checkins``. Replays skip (member, check_in_time) pairs
+that are already stored, so a crash between commit and journal cleanup
+never duplicates rows.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from . import rollups
+from .models import Attendance, Member
+
+logger = logging.getLogger(__name__)
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def _read_journal(path):
+    entries = []
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append was never acknowledged.
+                logger.warning('Skipping unreadable journal line in %s', path)
+    return entries
+
+
+def write_entries(entries):
+    """Insert journal entries as Attendance rows, skipping ones already stored."""
+    records = {}
+    for entry in entries:
+        key = (entry['member_id'], datetime.fromisoformat(entry['check_in_time']))
+        records[key] = Attendance(member_id=key[0], check_in_time=key[1])
+    if not records:
+        return 0
+
+    with transaction.atomic():
+        member_ids = {member_id for member_id, _ in records}
+        known = set(Member.objects.filter(pk__in=member_ids).values_list('pk', flat=True))
+        times = [check_in_time for _, check_in_time in records]
+        existing = set(Attendance.objects.filter(
+            member_id__in=known,
+            check_in_time__range=(min(times), max(times)),
+        ).values_list('member_id', 'check_in_time'))
+        new_records = [
+            record for key, record in records.items()
+            if key[0] in known and key not in existing
+        ]
+        Attendance.objects.bulk_create(new_records)
+        rollups.add_visits(new_records)
+    return len(new_records)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def recover_journals(journal_dir, include_live=False):
+    """Replay journals whose owning process is gone. Returns rows written."""
+    journal_dir = Path(journal_dir)
+    written = 0
+    for path in sorted(journal_dir.glob('*.*')):
+        name, _, claimer = path.name.partition('.recovering-')
+        try:
+            pid = int(name.split('.')[0])
+            claimer = int(claimer) if claimer else None
+        except ValueError:
+            continue
+        if pid == os.getpid() or (not include_live and _pid_alive(pid)):
+            continue
+        # Another process is replaying this one, unless it died part way.
+        if claimer is not None and (claimer == os.getpid() or _pid_alive(claimer)):
+            continue
+        # Claim the file first so two processes never replay it at once.
+        claimed = journal_dir / f'{name}.recovering-{os.getpid()}'
+        try:
+            os.rename(path, claimed)
+            entries = _read_journal(claimed)
+        except FileNotFoundError:
+            continue
+        written += write_entries(entries)
+        claimed.unlink()
+    return written
+
+
+class CheckInBuffer:
+    def __init__(self, journal_dir, batch_size=200, flush_interval=1.0, fsync=True):
+        self.journal_dir = Path(journal_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.pid = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            settings.GYM_CHECKIN_JOURNAL_DIR,
+            batch_size=settings.GYM_CHECKIN_BATCH_SIZE,
+            flush_interval=settings.GYM_CHECKIN_FLUSH_INTERVAL,
+            fsync=settings.GYM_CHECKIN_FSYNC,
+        )
+
+    @property
+    def journal_path(self):
+        return self.journal_dir / f'{self.pid}.jsonl'
+
+    def _start(self):
+        # Runs once per process, so a buffer inherited across fork() starts fresh.
+        self.pid = os.getpid()
+        self.pending = []
+        self.unflushed = []
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        recover_journals(self.journal_dir)
+        threading.Thread(target=self._run, name='checkin-flusher', daemon=True).start()
+        atexit.register(self.flush)
+
+    def submit(self, member_id, check_in_time=None):
+        with _buffer_lock:
+            if self.pid != os.getpid():
+                self._start()
+        entry = {
+            'member_id': member_id,
+            'check_in_time': (check_in_time or timezone.now()).isoformat(),
+        }
+        line = json.dumps(entry) + '\n'
+        with self.lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as fh:
+                fh.write(line)
+                fh.flush()
+                if self.fsync:
+                    os.fsync(fh.fileno())
+            self.pending.append(entry)
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.wakeup.set()
+        return entry
+
+    def flush(self):
+        if self.pid != os.getpid():
+            return 0
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return 0
+                # After a failed flush the journal may already be renamed,
+                # and every pending entry is in ``unflushed``.
+                if self.journal_path.exists():
+                    self.generation += 1
+                    flushing = self.journal_dir / f'{self.pid}.{self.generation}.flushing'
+                    os.replace(self.journal_path, flushing)
+                    self.unflushed.append(flushing)
+                batch, self.pending = self.pending, []
+            try:
+                written = write_entries(batch)
+            except Exception:
+                # Keep the entries (and their journal files) for the next attempt.
+                with self.lock:
+                    self.pending[:0] = batch
+                raise
+            # The batch held every entry of these files, so they can go.
+            for path in self.unflushed:
+                path.unlink(missing_ok=True)
+            self.unflushed = []
+            return written
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('Check-in flush failed; will retry')
+            finally:
+                connection.close()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = CheckInBuffer.from_settings()
+    return _buffer
@@ -0,0 +1,32 @@
+"""System checks for optional packages that features depend on."""
+import importlib.util
+
+from django.core.checks import Warning, register
+
+from . import photos
+
+
+@register()
+def check_pillow(app_configs, **kwargs):
+    if photos.available():
+        return []
+    return [Warning(
+        'Pillow is not installed, so instructor photos cannot be uploaded and no resized variants are built.',
+        hint='pip install pillow',
+        id='gym.W001',
+    )]
+
+
+ASGI_SERVERS = ['uvicorn', 'daphne', 'hypercorn']
+
+
+@register(deploy=True)
+def check_asgi_server(app_configs, **kwargs):
+    # gunicorn alone serves gymapp.wsgi; the async views need gymapp.asgi.
+    if any(importlib.util.find_spec(name) for name in ASGI_SERVERS):
+        return []
+    return [Warning(
+        'No ASGI server is installed, so gymapp.asgi and the async views cannot be served.',
+        hint='pip install uvicorn, or deploy gymapp.wsgi with gunicorn.',
+        id='gym.W002',
+    )]
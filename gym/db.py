@@ -0,0 +1,84 @@
+"""SQLite production tuning and read-only view routing.
+
+``configure_sqlite`` applies ``GYM_SQLITE_PRAGMAS`` to every new SQLite
+connection. Views wrapped in ``read_only_view`` send their reads to the
+``READ_ONLY_DATABASE`` alias (a ``mode=ro`` connection to the same file)
+when it is configured, so in WAL mode they never queue behind writers.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+READ_ONLY_DATABASE = 'readonly'
+
+_in_read_only_view = ContextVar('gym_in_read_only_view', default=False)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'GYM_SQLITE_PRAGMAS', {}))
+    if connection.alias == READ_ONLY_DATABASE:
+        # The journal mode is a property of the file; set it from the writer.
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 'ON'
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def read_only_view(view_func):
+    """Route the ORM reads of a GET/HEAD view to the read-only connection."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view_func(request, *args, **kwargs)
+            token = _in_read_only_view.set(True)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _in_read_only_view.reset(token)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        token = _in_read_only_view.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _in_read_only_view.reset(token)
+    return wrapper
+
+
+class ReadOnlyViewRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _in_read_only_view.get()
+            and READ_ONLY_DATABASE in connections.databases
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return READ_ONLY_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        both = {obj1._state.db, obj2._state.db}
+        if both <= {DEFAULT_DB_ALIAS, READ_ONLY_DATABASE}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == READ_ONLY_DATABASE:
+            return False
+        return None
@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
-from .models import Member, ClassRegistration, Attendance
+from . import photos
+from .models import Member, ClassRegistration, Attendance, Instructor
 
 
 class MemberRegistrationForm(UserCreationForm):
@@ -89,3 +90,38 @@ class ProfileForm(forms.ModelForm):
             'phone': forms.TextInput(attrs={'class': 'form-control'}),
             'membership_type': forms.Select(attrs={'class': 'form-select'}),
         }
+
+
+class InstructorAdminForm(forms.ModelForm):
+    # ImageField needs Pillow to validate; without it any file is accepted.
+    photo_upload = (forms.ImageField if photos.available() else forms.FileField)(
+        required=False,
+        help_text='Replaces the photo. Resized variants are generated when saved.',
+    )
+    
+    class Meta:
+        model = Instructor
+        fields = '__all__'
+    
+    def clean_photo_upload(self):
+        upload = self.cleaned_data.get('photo_upload')
+        if upload and not photos.available():
+            raise forms.ValidationError('Photos cannot be processed: Pillow is not installed on the server.')
+        return upload
+
+
+class ClassRegistrationAdminForm(forms.ModelForm):
+    class Meta:
+        model = ClassRegistration
+        fields = '__all__'
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        occurrence = cleaned_data.get('occurrence')
+        if occurrence is None or cleaned_data.get('is_cancelled'):
+            return cleaned_data
+        # ``self.instance`` still holds the saved values here.
+        held = self.instance.pk and not self.instance.is_cancelled and self.instance.occurrence_id == occurrence.pk
+        if not held and (occurrence.seats_taken >= occurrence.capacity or occurrence.waitlist_length):
+            raise forms.ValidationError('This session has no free seat; members join its waitlist instead.')
+        return cleaned_data
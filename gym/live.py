@@ -0,0 +1,147 @@
+"""Live session availability for Server-Sent Events streams.
+
+Each worker process runs one ``Broadcaster``. Streams subscribe to the
+class sessions they show, and a single watcher thread re-reads seat counts
+for all subscribed sessions with one query whenever the ``ClassOccurrence``
+page version changes, then fans the new numbers out to every subscriber.
+Local commits wake the watcher straight away; changes made by other workers
+are picked up within ``POLL_SECONDS`` through the shared cache.
+
+Only the async views keep a stream open. The sync view answers with a
+single snapshot and a long ``retry:`` hint, which turns the browser's
+``EventSource`` into slow polling instead of a worker held per open tab.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections, transaction
+
+from .models import ClassOccurrence
+from .pagecache import model_versions
+
+logger = logging.getLogger('gym.live')
+
+POLL_SECONDS = 1
+KEEPALIVE_SECONDS = 15
+RETRY_MS = 3000
+# Sync (WSGI) streams send one snapshot and end, so a tab does not hold a
+# worker; the browser reconnects for the next snapshot after this long.
+SNAPSHOT_RETRY_MS = 30000
+MAX_CLASSES = 20
+KEEPALIVE = ': keepalive\n\n'
+
+
+def parse_class_ids(value):
+    ids = []
+    for part in value.split(','):
+        if part.strip().isdigit() and int(part) not in ids:
+            ids.append(int(part))
+    return ids[:MAX_CLASSES]
+
+
+def availability(class_ids):
+    rows = ClassOccurrence.objects.filter(pk__in=class_ids).values_list('pk', 'capacity', 'seats_taken')
+    return {
+        pk: {'id': pk, 'capacity': capacity, 'taken': taken, 'spots': max(capacity - taken, 0)}
+        for pk, capacity, taken in rows
+    }
+
+
+def format_event(payload):
+    return f'event: availability\ndata: {json.dumps(payload, separators=(",", ":"))}\n\n'
+
+
+def stream_preamble(retry_ms=RETRY_MS):
+    return f'retry: {retry_ms}\n\n'
+
+
+class Subscription:
+    """Receives availability payloads for a set of class sessions.
+
+    Sync streams read from ``queue``. Async streams pass their event ``loop``
+    and read from ``aqueue``; deliveries are handed to the loop thread-safely.
+    """
+
+    def __init__(self, class_ids, loop=None):
+        self.class_ids = frozenset(class_ids)
+        self.loop = loop
+        if loop is None:
+            self.queue = queue.SimpleQueue()
+        else:
+            self.aqueue = asyncio.Queue()
+
+    def deliver(self, payload):
+        if self.loop is None:
+            self.queue.put(payload)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.aqueue.put_nowait, payload)
+
+
+class Broadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self._version = None
+        self._ids = set()
+        self._last = {}
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='gym-live-broadcaster', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def wake(self):
+        self._wake.set()
+
+    def _watched(self):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return subscriptions, set().union(*(s.class_ids for s in subscriptions))
+
+    def poll(self, force=False):
+        """Publish sessions whose availability changed since the last poll."""
+        subscriptions, class_ids = self._watched()
+        if not class_ids:
+            self._ids, self._last = set(), {}
+            return
+        version = model_versions([ClassOccurrence])[0]
+        if not force and version == self._version and class_ids <= self._ids:
+            return
+        self._version, self._ids = version, class_ids
+        current = availability(class_ids)
+        changed = {pk: row for pk, row in current.items() if self._last.get(pk) != row}
+        self._last = current
+        for subscription in subscriptions:
+            for pk in subscription.class_ids & changed.keys():
+                subscription.deliver(changed[pk])
+
+    def _run(self):
+        while True:
+            woken = self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.poll(force=woken)
+            except Exception:
+                # Keep the streams open; the next poll retries.
+                logger.exception('Polling session availability failed')
+
+
+broadcaster = Broadcaster()
+
+
+def class_changed():
+    """Wake this worker's broadcaster once the current transaction commits."""
+    transaction.on_commit(broadcaster.wake)
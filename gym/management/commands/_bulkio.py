@@ -0,0 +1,110 @@
+"""Shared helpers for the streaming import/export commands."""
+import csv
+import json
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+FORMATS = ('csv', 'jsonl')
+
+
+def add_io_arguments(parser, default_batch_size):
+    parser.add_argument('path', help="File to read or write, or '-' for stdin/stdout.")
+    parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else csv.')
+    parser.add_argument('--batch-size', type=int, default=default_batch_size)
+
+
+def detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+@contextmanager
+def open_stream(path, mode):
+    if path == '-':
+        yield sys.stdin if mode == 'r' else sys.stdout
+        return
+    try:
+        fh = open(path, mode, newline='', encoding='utf-8')
+    except OSError as exc:
+        raise CommandError(exc)
+    with fh:
+        yield fh
+
+
+def read_rows(fh, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(fh)
+        return
+    for line_no, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise CommandError(f'Line {line_no}: {exc}')
+
+
+class RowWriter:
+    def __init__(self, fh, fmt, fields):
+        self.fh = fh
+        self.fmt = fmt
+        self.fields = fields
+        if fmt == 'csv':
+            self.writer = csv.writer(fh)
+            self.writer.writerow(fields)
+
+    def write(self, values):
+        values = [v.isoformat() if hasattr(v, 'isoformat') else v for v in values]
+        if self.fmt == 'csv':
+            self.writer.writerow(['' if v is None else v for v in values])
+        else:
+            self.fh.write(json.dumps(dict(zip(self.fields, values))) + '\n')
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def to_datetime(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f'Invalid datetime: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def to_bool(value, default=True):
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 't', 'y')
+
+
+class Throughput:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+
+    def add(self, count):
+        self.rows += count
+
+    def summary(self, verb):
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed else 0
+        return f'{verb} {self.rows} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)'
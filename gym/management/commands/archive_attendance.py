@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gym import archive
+
+
+class Command(BaseCommand):
+    help = 'Move old check-ins to the attendance archive in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.GYM_ATTENDANCE_RETENTION_DAYS,
+            help=f'Archive check-ins older than this many days (default {settings.GYM_ATTENDANCE_RETENTION_DAYS}).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.GYM_ARCHIVE_BATCH_SIZE,
+            help=f'Rows moved per transaction (default {settings.GYM_ARCHIVE_BATCH_SIZE}).',
+        )
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to wait between batches.')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError('--older-than must be at least 1.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        progress = None
+        if options['verbosity'] > 1:
+            progress = lambda moved: self.stderr.write(f'Archived {moved} check-ins')
+        moved = archive.archive(cutoff, batch_size=options['batch_size'], pause=options['pause'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} check-in(s) from before {timezone.localtime(cutoff):%Y-%m-%d %H:%M}'))
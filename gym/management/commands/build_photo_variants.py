@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gym import pagecache, photos
+from gym.models import Instructor
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for instructor photos that lack them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild variants even if they look current.')
+
+    def handle(self, *args, **options):
+        if not photos.available():
+            raise CommandError('Pillow is required to build photo variants (pip install pillow).')
+
+        changed = failed = 0
+        for instructor in Instructor.objects.only('pk', 'name', 'photo', 'photo_variants').iterator():
+            try:
+                if photos.refresh(instructor, force=options['force']):
+                    changed += 1
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'Built variants for {instructor.name}')
+            except OSError as exc:
+                failed += 1
+                self.stderr.write(f'Skipped {instructor.name} ({instructor.photo}): {exc}')
+
+        if changed:
+            pagecache.touch(Instructor)
+        self.stdout.write(self.style.SUCCESS(f'Updated photo variants for {changed} instructor(s); {failed} failed'))
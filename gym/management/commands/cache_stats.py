@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from gym import stats
+
+
+class Command(BaseCommand):
+    help = 'Show how often the cached dashboard statistics were served from the cache.'
+
+    def handle(self, *args, **options):
+        counts = stats.cache_stats()
+        total = counts['hits'] + counts['misses']
+        rate = f'{counts["hits"] / total:.1%}' if total else 'n/a'
+        self.stdout.write(f"Hits: {counts['hits']}\nMisses: {counts['misses']}\nHit rate: {rate}")
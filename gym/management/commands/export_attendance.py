@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from gym.models import ArchivedAttendance, Attendance
+
+from ._bulkio import RowWriter, Throughput, add_io_arguments, detect_format, open_stream, to_datetime
+
+FIELDS = ['member_email', 'check_in_time', 'check_out_time']
+
+
+class Command(BaseCommand):
+    help = 'Stream check-ins to CSV or JSONL.'
+
+    def add_arguments(self, parser):
+        add_io_arguments(parser, default_batch_size=5000)
+        parser.add_argument('--since', help='Only export check-ins at or after this datetime.')
+        parser.add_argument('--archived', action='store_true', help='Also export check-ins moved to the archive.')
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        progress = Throughput()
+        models = [ArchivedAttendance, Attendance] if options['archived'] else [Attendance]
+
+        with open_stream(options['path'], 'w') as fh:
+            writer = RowWriter(fh, fmt, FIELDS)
+            # The archive holds the older check-ins, so it goes first.
+            for model in models:
+                queryset = model.objects.order_by('pk')
+                if options['since']:
+                    queryset = queryset.filter(check_in_time__gte=to_datetime(options['since']))
+                rows = queryset.values_list('member__email', 'check_in_time', 'check_out_time').iterator(
+                    chunk_size=options['batch_size'],
+                )
+                for values in rows:
+                    writer.write(values)
+                    progress.add(1)
+
+        self.stderr.write(self.style.SUCCESS(progress.summary('Exported')))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from gym.models import Member
+
+from ._bulkio import RowWriter, Throughput, add_io_arguments, detect_format, open_stream
+
+FIELDS = ['email', 'first_name', 'last_name', 'phone', 'membership_type', 'date_joined', 'is_active']
+
+
+class Command(BaseCommand):
+    help = 'Stream all members to CSV or JSONL.'
+
+    def add_arguments(self, parser):
+        add_io_arguments(parser, default_batch_size=2000)
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        progress = Throughput()
+        rows = Member.objects.order_by('pk').values_list(*FIELDS).iterator(chunk_size=options['batch_size'])
+
+        with open_stream(options['path'], 'w') as fh:
+            writer = RowWriter(fh, fmt, FIELDS)
+            for values in rows:
+                writer.write(values)
+                progress.add(1)
+
+        self.stderr.write(self.style.SUCCESS(progress.summary('Exported')))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gym.checkins import recover_journals
+
+
+class Command(BaseCommand):
+    help = 'Replay check-in journals left behind by stopped or crashed processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Also replay journals of processes that still look alive (only when the server is stopped).',
+        )
+
+    def handle(self, *args, **options):
+        written = recover_journals(settings.GYM_CHECKIN_JOURNAL_DIR, include_live=options['all'])
+        self.stdout.write(self.style.SUCCESS(f'Recovered {written} check-ins'))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gym import occurrences, pagecache
+from gym.models import ClassOccurrence
+
+
+class Command(BaseCommand):
+    help = 'Create the dated sessions of every active class for the coming weeks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--weeks', type=int, default=settings.GYM_OCCURRENCE_WEEKS,
+            help=f'How many weeks ahead to fill in (default {settings.GYM_OCCURRENCE_WEEKS}).',
+        )
+
+    def handle(self, *args, **options):
+        if options['weeks'] < 1:
+            raise CommandError('--weeks must be at least 1.')
+
+        created = occurrences.generate(weeks=options['weeks'])
+        if created:
+            pagecache.touch(ClassOccurrence)
+        self.stdout.write(self.style.SUCCESS(f'Created {created} class session(s) for the next {options["weeks"]} week(s)'))
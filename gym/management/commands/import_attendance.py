@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gym import rollups
+from gym.models import ArchivedAttendance, Attendance, Member
+
+from ._bulkio import Throughput, add_io_arguments, batched, detect_format, open_stream, read_rows, to_datetime
+
+
+class Command(BaseCommand):
+    help = 'Stream check-ins from CSV or JSONL, skipping (member, check_in_time) duplicates.'
+
+    def add_arguments(self, parser):
+        add_io_arguments(parser, default_batch_size=5000)
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        progress = Throughput()
+        skipped = 0
+
+        with open_stream(options['path'], 'r') as fh:
+            for batch in batched(read_rows(fh, fmt), options['batch_size']):
+                records = self.build_records(batch)
+                with transaction.atomic():
+                    new_records = self.drop_existing(records)
+                    Attendance.objects.bulk_create(new_records, batch_size=options['batch_size'])
+                    rollups.add_visits(new_records)
+                skipped += len(batch) - len(new_records)
+                progress.add(len(new_records))
+                if options['verbosity'] > 1:
+                    self.stderr.write(progress.summary('Imported'))
+
+        self.stderr.write(self.style.SUCCESS(f"{progress.summary('Imported')}, skipped {skipped} duplicates"))
+
+    def build_records(self, batch):
+        emails = {Member.normalize_email(row.get('member_email')) for row in batch}
+        member_ids = dict(Member.objects.filter(email__in=emails).values_list('email', 'pk'))
+
+        records = {}
+        for row in batch:
+            email = Member.normalize_email(row.get('member_email'))
+            if email not in member_ids:
+                raise CommandError(f'Unknown member {email!r}')
+            check_in_time = to_datetime(row.get('check_in_time'))
+            if check_in_time is None:
+                raise CommandError(f'Row without check_in_time: {row!r}')
+            key = (member_ids[email], check_in_time)
+            records[key] = Attendance(
+                member_id=key[0],
+                check_in_time=check_in_time,
+                check_out_time=to_datetime(row.get('check_out_time')),
+            )
+        return records
+
+    def drop_existing(self, records):
+        if not records:
+            return []
+        times = [check_in_time for _, check_in_time in records]
+        existing = set()
+        for model in (Attendance, ArchivedAttendance):
+            existing.update(model.objects.filter(
+                member_id__in={member_id for member_id, _ in records},
+                check_in_time__range=(min(times), max(times)),
+            ).values_list('member_id', 'check_in_time'))
+        return [record for key, record in records.items() if key not in existing]
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gym import pagecache, search, stats
+from gym.models import Member
+
+from ._bulkio import Throughput, add_io_arguments, batched, detect_format, open_stream, read_rows, to_bool, to_datetime
+
+UPDATE_FIELDS = ['first_name', 'last_name', 'phone', 'membership_type', 'is_active']
+MEMBERSHIP_TYPES = dict(Member.MEMBERSHIP_TYPES)
+
+
+class Command(BaseCommand):
+    help = 'Stream members from CSV or JSONL, upserting on email.'
+
+    def add_arguments(self, parser):
+        add_io_arguments(parser, default_batch_size=2000)
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        progress = Throughput()
+
+        with open_stream(options['path'], 'r') as fh:
+            for batch in batched(read_rows(fh, fmt), options['batch_size']):
+                # Later rows win when the same email appears twice in a batch.
+                members = {}
+                dated = set()
+                for row in batch:
+                    member, has_date_joined = self.build_member(row)
+                    members[member.email] = member
+                    if has_date_joined:
+                        dated.add(member.email)
+                    else:
+                        dated.discard(member.email)
+                # An existing member's join date only changes if the row has one.
+                upserts = [(dated, UPDATE_FIELDS + ['date_joined']), (members.keys() - dated, UPDATE_FIELDS)]
+                with transaction.atomic():
+                    for emails, update_fields in upserts:
+                        if emails:
+                            Member.objects.bulk_create(
+                                [members[email] for email in emails],
+                                update_conflicts=True,
+                                unique_fields=['email'],
+                                update_fields=update_fields,
+                            )
+                    # bulk_create sends no signals; index the batch with it.
+                    search.index_pks('member', Member.objects.filter(email__in=members).values_list('pk', flat=True))
+                progress.add(len(batch))
+                if options['verbosity'] > 1:
+                    self.stderr.write(progress.summary('Imported'))
+
+        stats.invalidate(Member)
+        pagecache.touch(Member)
+        self.stderr.write(self.style.SUCCESS(progress.summary('Imported')))
+
+    def build_member(self, row):
+        email = Member.normalize_email(row.get('email'))
+        if not email:
+            raise CommandError(f'Row without email: {row!r}')
+        membership_type = row.get('membership_type') or 'basic'
+        if membership_type not in MEMBERSHIP_TYPES:
+            raise CommandError(f'Unknown membership type {membership_type!r} for {email}')
+        member = Member(
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+            email=email,
+            phone=row.get('phone', ''),
+            membership_type=membership_type,
+            is_active=to_bool(row.get('is_active')),
+        )
+        date_joined = to_datetime(row.get('date_joined'))
+        if date_joined:
+            member.date_joined = date_joined
+        return member, date_joined is not None
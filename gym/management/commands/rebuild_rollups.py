@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from gym import rollups
+from gym.models import ArchivedAttendance, Attendance
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Recompute hourly and per-member monthly visit rollups for a date range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date, help='First local date (default: first check-in).')
+        parser.add_argument('--end', type=parse_date, help='Last local date (default: last check-in).')
+
+    def handle(self, *args, **options):
+        bounds = [
+            model.objects.aggregate(first=Min('check_in_time'), last=Max('check_in_time'))
+            for model in (ArchivedAttendance, Attendance)
+        ]
+        firsts = [b['first'] for b in bounds if b['first']]
+        lasts = [b['last'] for b in bounds if b['last']]
+        start = options['start'] or (firsts and timezone.localtime(min(firsts)).date())
+        end = options['end'] or (lasts and timezone.localtime(max(lasts)).date())
+        if not start or not end:
+            self.stdout.write('No attendance to roll up.')
+            return
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        # One transaction per month keeps each write lock short.
+        chunk_start = start
+        while chunk_start <= end:
+            next_month = (chunk_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            chunk_end = min(end, next_month - timedelta(days=1))
+            rollups.rebuild(chunk_start, chunk_end)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Rebuilt {chunk_start} to {chunk_end}')
+            chunk_start = next_month
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt visit rollups from {start} to {end}'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from gym import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of members, classes and instructors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.create_table(connection):
+            raise CommandError('Full-text search needs SQLite with FTS5; searches use plain queries instead.')
+        rows = search.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {rows} row(s)'))
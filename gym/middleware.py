@@ -0,0 +1,240 @@
+import logging
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import auth, staticfiles
+
+logger = logging.getLogger('gym.sql')
+
+PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+THIS_FILE = str(Path(__file__).resolve())
+
+
+def _call_site():
+    """Return the innermost project frame outside this module as ``file:line``."""
+    for frame in reversed(traceback.extract_stack()):
+        filename = str(Path(frame.filename).resolve())
+        if filename == THIS_FILE or not filename.startswith(PROJECT_ROOT) or 'site-packages' in filename:
+            continue
+        return f'{Path(filename).relative_to(PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.call_sites = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+            if sql not in self.call_sites:
+                self.call_sites[sql] = _call_site()
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+class QueryInstrumentationMiddleware:
+    """Count queries and DB time per request and report them.
+
+    Enabled with ``GYM_SQL_INSTRUMENTATION``. Adds a ``Server-Timing`` header
+    and logs requests over ``GYM_SLOW_REQUEST_QUERIES`` queries or
+    ``GYM_SLOW_REQUEST_DB_MS`` of database time, naming the view and the call
+    site of the most repeated statement (the usual N+1 culprit).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'GYM_SQL_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_queries = getattr(settings, 'GYM_SLOW_REQUEST_QUERIES', 50)
+        self.max_db_ms = getattr(settings, 'GYM_SLOW_REQUEST_DB_MS', 200)
+        self.repeat_threshold = getattr(settings, 'GYM_REPEATED_QUERY_THRESHOLD', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        # The async ORM runs its queries on the request's sync thread, whose
+        # connections are not the event loop's, so the wrappers go there.
+        recorder = QueryRecorder()
+        recording = await sync_to_async(self.recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.close)()
+        return self.report(request, response, recorder)
+
+    def recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def report(self, request, response, recorder):
+        db_ms = recorder.duration * 1000
+        response['Server-Timing'] = f'db;dur={db_ms:.1f};desc="{recorder.count} queries"'
+
+        sql, repeats = recorder.most_repeated()
+        if recorder.count > self.max_queries or db_ms > self.max_db_ms or repeats >= self.repeat_threshold:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(
+                '%s %s (%s): %d queries, %.1fms in DB; most repeated x%d at %s: %s',
+                request.method,
+                request.path,
+                match.view_name if match else '-',
+                recorder.count,
+                db_ms,
+                repeats,
+                recorder.call_sites.get(sql),
+                sql,
+            )
+        return response
+
+
+async def _aread(path, chunk_size):
+    # An async iterator, so ASGI streams the file instead of buffering it
+    # through StreamingHttpResponse's sync fallback.
+    fh = await sync_to_async(open, thread_sensitive=False)(path, 'rb')
+    read = sync_to_async(fh.read, thread_sensitive=False)
+    try:
+        while chunk := await read(chunk_size):
+            yield chunk
+    finally:
+        fh.close()
+
+
+class StaticFilesMiddleware:
+    """Serve ``STATIC_ROOT`` in-process, for deployments without a web server.
+
+    Enabled with ``GYM_SERVE_STATIC``. Files are indexed once at startup, so
+    restart workers after ``collectstatic``. The smallest precompressed copy
+    the client accepts is sent. Fingerprinted names from the manifest are
+    cached for a year as immutable; anything else must revalidate.
+    """
+
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    REVALIDATE = 'public, max-age=0, must-revalidate'
+    CHUNK_SIZE = 64 * 1024
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'GYM_SERVE_STATIC', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = staticfiles.scan(settings.STATIC_ROOT)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.match(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        static_file = self.match(request)
+        if static_file is not None:
+            return self.serve(request, static_file, asynchronous=True)
+        return await self.get_response(request)
+
+    def match(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            return self.files.get(request.path[len(self.prefix):])
+        return None
+
+    def accepted_encoding(self, request, static_file):
+        accepted = set()
+        for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+            coding, _, params = part.partition(';')
+            if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                accepted.add(coding.strip().lower())
+        candidates = [encoding for encoding in static_file.encodings if encoding in accepted]
+        return min(candidates, key=lambda encoding: static_file.encodings[encoding][1], default=None)
+
+    def serve(self, request, static_file, asynchronous=False):
+        encoding = self.accepted_encoding(request, static_file)
+        path, size = static_file.encodings[encoding] if encoding else (static_file.path, static_file.size)
+        etag = f'"{static_file.mtime:x}-{static_file.size:x}{"-" + encoding if encoding else ""}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=static_file.mtime)
+        if response is None:
+            if asynchronous:
+                response = StreamingHttpResponse(_aread(path, self.CHUNK_SIZE), content_type=static_file.content_type)
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=static_file.content_type)
+            response['Content-Length'] = size
+            if encoding:
+                response['Content-Encoding'] = encoding
+        elif not isinstance(response, HttpResponseNotModified):
+            return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(static_file.mtime)
+        response['Cache-Control'] = self.IMMUTABLE if static_file.immutable else self.REVALIDATE
+        if static_file.encodings:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+class MemberMiddleware:
+    """Set ``request.member`` to the signed-in user's Member, or None.
+
+    Must come after ``AuthenticationMiddleware``. With
+    ``gym.auth.MemberModelBackend`` the member arrives with the user, so this
+    costs no extra query. Requests without a session don't touch the database.
+    Under ASGI the user and member are loaded without leaving the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.member = auth.get_member(request.user)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        # Resolved already; spares sync views a second lookup of the lazy user.
+        request.user = user
+        request.member = await auth.aget_member(user)
+        return await self.get_response(request)
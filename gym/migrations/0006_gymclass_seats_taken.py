@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats_taken(apps, schema_editor):
+    GymClass = apps.get_model('gym', 'GymClass')
+    ClassRegistration = apps.get_model('gym', 'ClassRegistration')
+    active = ClassRegistration.objects.filter(gym_class=OuterRef('pk'), is_cancelled=False)
+    GymClass.objects.update(seats_taken=Coalesce(
+        Subquery(active.order_by().values('gym_class').annotate(n=Count('pk')).values('n')),
+        0,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0005_instructor_photo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gymclass',
+            name='seats_taken',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_seats_taken, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0006_gymclass_seats_taken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyVisits',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('visits', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Hourly Visits',
+                'verbose_name_plural': 'Hourly Visits',
+                'ordering': ['date', 'hour'],
+                'unique_together': {('date', 'hour')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MemberMonthlyVisits',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('visits', models.PositiveIntegerField(default=0)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_visits', to='gym.member')),
+            ],
+            options={
+                'verbose_name': 'Member Monthly Visits',
+                'verbose_name_plural': 'Member Monthly Visits',
+                'ordering': ['-month'],
+                'unique_together': {('member', 'month')},
+            },
+        ),
+    ]
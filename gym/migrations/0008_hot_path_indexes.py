@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0007_visit_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['member', '-check_in_time'], name='gym_attendance_member_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['check_in_time'], name='gym_attendance_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classregistration',
+            index=models.Index(fields=['gym_class', 'is_cancelled'], name='gym_reg_class_cancelled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classregistration',
+            index=models.Index(fields=['member', 'is_cancelled'], name='gym_reg_member_cancelled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classregistration',
+            index=models.Index(condition=models.Q(('is_cancelled', False)), fields=['gym_class', '-registered_at'], name='gym_reg_class_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gymclass',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['day_of_week', 'start_time'], name='gym_class_active_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gymevent',
+            index=models.Index(fields=['date', 'is_active'], name='gym_event_date_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gymevent',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date', 'start_time'], name='gym_event_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instructor',
+            index=models.Index(fields=['name'], name='gym_instructor_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['is_active', '-date_joined'], name='gym_member_active_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-date_joined', '-id'], name='gym_member_active_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='specialhours',
+            index=models.Index(fields=['date'], name='gym_specialhours_date_idx'),
+        ),
+    ]
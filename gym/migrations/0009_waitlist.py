@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gymclass',
+            name='waitlist_length',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('gym_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='gym.gymclass')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='gym.member')),
+            ],
+            options={
+                'verbose_name_plural': 'Waitlist Entries',
+                'ordering': ['gym_class', 'position'],
+                'indexes': [models.Index(fields=['gym_class', 'position'], name='gym_waitlist_class_pos_idx')],
+                'unique_together': {('member', 'gym_class')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0009_waitlist'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='gymclass',
+            old_name='instructor',
+            new_name='instructor_name',
+        ),
+        # A default lets 0012 be reversed on a populated table.
+        migrations.AlterField(
+            model_name='gymclass',
+            name='instructor_name',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='gymclass',
+            name='instructor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='classes', to='gym.instructor'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:05
+
+from django.db import migrations, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def _in_batches(GymClass, db, update):
+    # Each pk range is its own short transaction, so a large table never
+    # holds the write lock for the whole backfill.
+    last = GymClass.objects.using(db).aggregate(last=Max('pk'))['last'] or 0
+    for start in range(0, last + 1, BATCH_SIZE):
+        with transaction.atomic(using=db):
+            update(GymClass.objects.using(db).filter(pk__gte=start, pk__lt=start + BATCH_SIZE))
+
+
+def link_instructors(apps, schema_editor):
+    GymClass = apps.get_model('gym', 'GymClass')
+    Instructor = apps.get_model('gym', 'Instructor')
+    db = schema_editor.connection.alias
+
+    # Names with no matching Instructor get one, so no class loses its teacher.
+    names = set(
+        GymClass.objects.using(db).exclude(instructor_name='').order_by()
+        .values_list('instructor_name', flat=True).distinct()
+    )
+    known = set(Instructor.objects.using(db).values_list('name', flat=True))
+    Instructor.objects.using(db).bulk_create(
+        [Instructor(name=name, specialty='', bio='') for name in sorted(names - known)],
+        batch_size=500,
+    )
+
+    # Duplicate names resolve to the oldest instructor, as the views did.
+    match = Instructor.objects.using(db).filter(name=OuterRef('instructor_name')).order_by('pk').values('pk')[:1]
+    _in_batches(GymClass, db, lambda batch: batch.exclude(instructor_name='').update(instructor=Subquery(match)))
+
+
+def restore_instructor_names(apps, schema_editor):
+    GymClass = apps.get_model('gym', 'GymClass')
+    Instructor = apps.get_model('gym', 'Instructor')
+    db = schema_editor.connection.alias
+    name = Instructor.objects.using(db).filter(pk=OuterRef('instructor')).values('name')[:1]
+    _in_batches(GymClass, db, lambda batch: batch.filter(instructor__isnull=False).update(instructor_name=Subquery(name)))
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('gym', '0010_gymclass_instructor_fk'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_instructors, restore_instructor_names),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0011_backfill_gymclass_instructor'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='gymclass',
+            name='instructor_name',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0012_remove_gymclass_instructor_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instructor',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0013_instructor_photo_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('capacity', models.IntegerField()),
+                ('seats_taken', models.IntegerField(default=0, editable=False)),
+                ('waitlist_length', models.IntegerField(default=0, editable=False)),
+                ('is_cancelled', models.BooleanField(default=False)),
+                ('gym_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='gym.gymclass')),
+            ],
+            options={
+                'verbose_name': 'Class Session',
+                'verbose_name_plural': 'Class Sessions',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(condition=models.Q(('is_cancelled', False)), fields=['date', 'start_time'], name='gym_occurrence_active_idx')],
+                'unique_together': {('gym_class', 'date')},
+            },
+        ),
+        # Registrations become per session, so a member may hold several
+        # for one class; the new uniqueness is added once they are moved.
+        migrations.AlterUniqueTogether(
+            name='classregistration',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='waitlistentry',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='classregistration',
+            name='occurrence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='gym.classoccurrence'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='occurrence',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='gym.classoccurrence'),
+        ),
+        migrations.AlterField(
+            model_name='waitlistentry',
+            name='gym_class',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='gym.gymclass'),
+        ),
+    ]
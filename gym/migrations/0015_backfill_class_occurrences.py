@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:12
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+
+def create_sessions(apps, schema_editor):
+    GymClass = apps.get_model('gym', 'GymClass')
+    ClassOccurrence = apps.get_model('gym', 'ClassOccurrence')
+    ClassRegistration = apps.get_model('gym', 'ClassRegistration')
+    WaitlistEntry = apps.get_model('gym', 'WaitlistEntry')
+    db = schema_editor.connection.alias
+
+    # Same horizon as gym.occurrences.generate, which can't be imported here
+    # because it uses the current models.
+    today = timezone.localdate()
+    for gym_class in GymClass.objects.using(db).filter(is_active=True).iterator():
+        first = today + timedelta(days=(gym_class.day_of_week - today.weekday()) % 7)
+        sessions = ClassOccurrence.objects.using(db).bulk_create([
+            ClassOccurrence(
+                gym_class_id=gym_class.pk, date=first + timedelta(weeks=week),
+                start_time=gym_class.start_time, capacity=gym_class.capacity,
+            )
+            for week in range(settings.GYM_OCCURRENCE_WEEKS)
+        ])
+        if not sessions:
+            continue
+        # Active registrations and the waitlist carry over to the class's
+        # next session.
+        session = ClassOccurrence.objects.using(db).get(gym_class_id=gym_class.pk, date=first)
+        moved = ClassRegistration.objects.using(db).filter(
+            gym_class_id=gym_class.pk, is_cancelled=False,
+        ).update(occurrence=session)
+        waiting = WaitlistEntry.objects.using(db).filter(gym_class_id=gym_class.pk).update(occurrence=session)
+        ClassOccurrence.objects.using(db).filter(pk=session.pk).update(seats_taken=moved, waitlist_length=waiting)
+
+    # Inactive classes have no session to wait for.
+    WaitlistEntry.objects.using(db).filter(occurrence__isnull=True).delete()
+
+
+def restore_class_counts(apps, schema_editor):
+    GymClass = apps.get_model('gym', 'GymClass')
+    ClassRegistration = apps.get_model('gym', 'ClassRegistration')
+    WaitlistEntry = apps.get_model('gym', 'WaitlistEntry')
+    db = schema_editor.connection.alias
+
+    # A class held one registration per member; keep each member's latest.
+    registrations = ClassRegistration.objects.using(db)
+    for row in registrations.values('member_id', 'gym_class_id').annotate(n=Count('pk'), keep=Max('pk')).filter(n__gt=1):
+        registrations.filter(member_id=row['member_id'], gym_class_id=row['gym_class_id']).exclude(pk=row['keep']).delete()
+
+    waitlist = WaitlistEntry.objects.using(db)
+    for entry in waitlist.select_related('occurrence').order_by('occurrence__date', 'position'):
+        entry.gym_class_id = entry.occurrence.gym_class_id
+        entry.save(update_fields=['gym_class'])
+    for row in waitlist.values('member_id', 'gym_class_id').annotate(n=Count('pk'), keep=Min('pk')).filter(n__gt=1):
+        waitlist.filter(member_id=row['member_id'], gym_class_id=row['gym_class_id']).exclude(pk=row['keep']).delete()
+
+    for gym_class in GymClass.objects.using(db).iterator():
+        GymClass.objects.using(db).filter(pk=gym_class.pk).update(
+            seats_taken=registrations.filter(gym_class_id=gym_class.pk, is_cancelled=False).count(),
+            waitlist_length=waitlist.filter(gym_class_id=gym_class.pk).count(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0014_class_occurrences'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sessions, restore_class_counts),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0015_backfill_class_occurrences'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='classregistration',
+            name='gym_reg_class_cancelled_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='classregistration',
+            name='gym_reg_class_active_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='waitlistentry',
+            name='gym_waitlist_class_pos_idx',
+        ),
+        migrations.AlterModelOptions(
+            name='waitlistentry',
+            options={'ordering': ['occurrence', 'position'], 'verbose_name_plural': 'Waitlist Entries'},
+        ),
+        migrations.RemoveField(
+            model_name='waitlistentry',
+            name='gym_class',
+        ),
+        migrations.AlterField(
+            model_name='waitlistentry',
+            name='occurrence',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='gym.classoccurrence'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='classregistration',
+            unique_together={('member', 'occurrence')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='waitlistentry',
+            unique_together={('member', 'occurrence')},
+        ),
+        migrations.AddIndex(
+            model_name='classregistration',
+            index=models.Index(fields=['occurrence', 'is_cancelled'], name='gym_reg_occ_cancelled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classregistration',
+            index=models.Index(condition=models.Q(('is_cancelled', False)), fields=['occurrence', '-registered_at'], name='gym_reg_occ_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['occurrence', 'position'], name='gym_waitlist_occ_pos_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='gymclass',
+            name='seats_taken',
+        ),
+        migrations.RemoveField(
+            model_name='gymclass',
+            name='waitlist_length',
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:20
+
+from django.db import OperationalError, migrations
+
+# The index as it was defined when this migration was written; gym.search
+# may change later without changing what this migration does.
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS gym_search USING fts5("
+    "label UNINDEXED, text, active UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+POPULATE = [
+    "INSERT INTO gym_search (rowid, label, text, active) "
+    "SELECT id * 4 + 1, first_name || ' ' || last_name, "
+    "first_name || ' ' || last_name || ' ' || email || ' ' || phone, is_active FROM gym_member",
+    "INSERT INTO gym_search (rowid, label, text, active) "
+    "SELECT id * 4 + 2, name, name, is_active FROM gym_gymclass",
+    "INSERT INTO gym_search (rowid, label, text, active) "
+    "SELECT id * 4 + 3, name, name || ' ' || specialty, 1 FROM gym_instructor",
+    "INSERT INTO gym_search (gym_search) VALUES ('optimize')",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Skipped quietly where FTS5 is missing; gym.search then falls back.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_TABLE)
+        except OperationalError:
+            return
+        cursor.execute('DELETE FROM gym_search')
+        for sql in POPULATE:
+            cursor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS gym_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0016_registrations_per_occurrence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
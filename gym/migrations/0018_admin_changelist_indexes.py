@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0017_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classregistration',
+            index=models.Index(fields=['-registered_at', '-id'], name='gym_reg_registered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['-date_joined', '-id'], name='gym_member_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membermonthlyvisits',
+            index=models.Index(fields=['-month', '-id'], name='gym_monthly_month_idx'),
+        ),
+    ]
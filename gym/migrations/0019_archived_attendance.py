@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0018_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('check_in_time', models.DateTimeField()),
+                ('check_out_time', models.DateTimeField(blank=True, null=True)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='gym.member')),
+            ],
+            options={
+                'ordering': ['-check_in_time'],
+                'indexes': [models.Index(fields=['member', '-check_in_time'], name='gym_archived_member_time_idx'), models.Index(fields=['check_in_time'], name='gym_archived_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:05
+
+from django.db import migrations
+
+
+def normalize_email(email):
+    # Member.normalize_email as of this migration.
+    return (email or '').strip().lower()
+
+
+def lowercase_emails(apps, schema_editor):
+    Member = apps.get_model('gym', 'Member')
+    members = Member.objects.using(schema_editor.connection.alias)
+    # Compared in Python: SQL's TRIM and LOWER differ from str.strip and
+    # str.lower on other whitespace and non-ASCII letters.
+    for pk, email in members.order_by('pk').values_list('pk', 'email').iterator():
+        normalized = normalize_email(email)
+        if normalized == email:
+            continue
+        # Two members differing only in case: leave the second one for staff.
+        if not members.filter(email=normalized).exists():
+            members.filter(pk=pk).update(email=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym', '0019_archived_attendance'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 from django.utils import timezone
 
+from . import photos
+
 
 class Member(models.Model):
     MEMBERSHIP_TYPES = [
@@ -22,8 +27,25 @@ class Member(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
+    @staticmethod
+    def normalize_email(email):
+        # Emails are stored lowercased so lookups, imports and the unique
+        # constraint all agree on case.
+        return (email or '').strip().lower()
+    
+    def save(self, *args, **kwargs):
+        self.email = self.normalize_email(self.email)
+        super().save(*args, **kwargs)
+    
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['is_active', '-date_joined'], name='gym_member_active_joined_idx'),
+            models.Index(
+                fields=['-date_joined', '-id'], condition=Q(is_active=True), name='gym_member_active_keyset_idx',
+            ),
+            models.Index(fields=['-date_joined', '-id'], name='gym_member_joined_idx'),
+        ]
 
 
 class Instructor(models.Model):
@@ -34,12 +56,28 @@ class Instructor(models.Model):
     certifications = models.TextField(blank=True)
     email = models.EmailField(blank=True)
     photo = models.CharField(max_length=255, blank=True)
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     def __str__(self):
         return self.name
     
+    def photo_url(self):
+        # Smallest JPEG variant, or the original when none were generated.
+        if self.photo_variants.get('jpeg'):
+            return default_storage.url(self.photo_variants['jpeg'][0][1])
+        return default_storage.url(self.photo) if self.photo else ''
+    
+    def photo_webp_srcset(self):
+        return photos.srcset(self.photo_variants, 'webp')
+    
+    def photo_jpeg_srcset(self):
+        return photos.srcset(self.photo_variants, 'jpeg')
+    
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='gym_instructor_name_idx'),
+        ]
 
 
 class GymClass(models.Model):
@@ -55,7 +93,9 @@ class GymClass(models.Model):
     
     name = models.CharField(max_length=100)
     description = models.TextField()
-    instructor = models.CharField(max_length=100)
+    instructor = models.ForeignKey(
+        Instructor, on_delete=models.SET_NULL, null=True, blank=True, related_name='classes',
+    )
     day_of_week = models.IntegerField(choices=WEEKDAYS)
     start_time = models.TimeField()
     duration_minutes = models.IntegerField(default=60)
@@ -65,21 +105,69 @@ class GymClass(models.Model):
     def __str__(self):
         return f"{self.name} - {self.get_day_of_week_display()} {self.start_time}"
     
-    def current_registrations(self):
-        return self.registrations.filter(is_cancelled=False).count()
-    
-    def spots_available(self):
-        return self.capacity - self.current_registrations()
-    
     class Meta:
         ordering = ['day_of_week', 'start_time']
+        indexes = [
+            models.Index(
+                fields=['day_of_week', 'start_time'], condition=Q(is_active=True), name='gym_class_active_slot_idx',
+            ),
+        ]
         verbose_name = 'Class'
         verbose_name_plural = 'Classes'
 
 
+class ClassOccurrenceQuerySet(models.QuerySet):
+    def upcoming(self):
+        return self.filter(date__gte=timezone.localdate(), is_cancelled=False)
+    
+    def sync_seats_taken(self):
+        active = ClassRegistration.objects.filter(occurrence=OuterRef('pk'), is_cancelled=False)
+        return self.update(seats_taken=Coalesce(
+            Subquery(active.order_by().values('occurrence').annotate(n=Count('pk')).values('n')),
+            0,
+        ))
+
+
+class ClassOccurrence(models.Model):
+    """One dated session of a weekly ``GymClass``; generated ahead by ``gym.occurrences``."""
+    gym_class = models.ForeignKey(GymClass, on_delete=models.CASCADE, related_name='occurrences')
+    date = models.DateField()
+    start_time = models.TimeField()
+    capacity = models.IntegerField()
+    seats_taken = models.IntegerField(default=0, editable=False)
+    waitlist_length = models.IntegerField(default=0, editable=False)
+    is_cancelled = models.BooleanField(default=False)
+    
+    objects = ClassOccurrenceQuerySet.as_manager()
+    
+    def __str__(self):
+        return f"{self.gym_class.name} - {self.date:%a %b %d} {self.start_time:%H:%M}"
+    
+    def spots_available(self):
+        return max(self.capacity - self.seats_taken, 0)
+    
+    def is_open(self):
+        return not self.is_cancelled and self.date >= timezone.localdate()
+    
+    class Meta:
+        ordering = ['date', 'start_time']
+        unique_together = ['gym_class', 'date']
+        indexes = [
+            models.Index(
+                fields=['date', 'start_time'], condition=Q(is_cancelled=False), name='gym_occurrence_active_idx',
+            ),
+        ]
+        verbose_name = 'Class Session'
+        verbose_name_plural = 'Class Sessions'
+
+
 class ClassRegistration(models.Model):
     member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='registrations')
     gym_class = models.ForeignKey(GymClass, on_delete=models.CASCADE, related_name='registrations')
+    # Null only on registrations made before classes had dated sessions.
+    occurrence = models.ForeignKey(
+        ClassOccurrence, on_delete=models.CASCADE, null=True, blank=True, related_name='registrations',
+    )
     registered_at = models.DateTimeField(default=timezone.now)
     is_cancelled = models.BooleanField(default=False)
     attended = models.BooleanField(default=False)
@@ -89,7 +177,33 @@ class ClassRegistration(models.Model):
     
     class Meta:
         ordering = ['-registered_at']
-        unique_together = ['member', 'gym_class']
+        unique_together = ['member', 'occurrence']
+        indexes = [
+            models.Index(fields=['occurrence', 'is_cancelled'], name='gym_reg_occ_cancelled_idx'),
+            models.Index(fields=['member', 'is_cancelled'], name='gym_reg_member_cancelled_idx'),
+            models.Index(fields=['-registered_at', '-id'], name='gym_reg_registered_idx'),
+            models.Index(
+                fields=['occurrence', '-registered_at'], condition=Q(is_cancelled=False), name='gym_reg_occ_active_idx',
+            ),
+        ]
+
+
+class WaitlistEntry(models.Model):
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='waitlist_entries')
+    occurrence = models.ForeignKey(ClassOccurrence, on_delete=models.CASCADE, related_name='waitlist')
+    position = models.PositiveIntegerField()
+    joined_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.member} - {self.occurrence} (#{self.position})"
+    
+    class Meta:
+        ordering = ['occurrence', 'position']
+        unique_together = ['member', 'occurrence']
+        indexes = [
+            models.Index(fields=['occurrence', 'position'], name='gym_waitlist_occ_pos_idx'),
+        ]
+        verbose_name_plural = 'Waitlist Entries'
 
 
 class Attendance(models.Model):
@@ -102,6 +216,61 @@ class Attendance(models.Model):
     
     class Meta:
         ordering = ['-check_in_time']
+        indexes = [
+            models.Index(fields=['member', '-check_in_time'], name='gym_attendance_member_time_idx'),
+            models.Index(fields=['check_in_time'], name='gym_attendance_time_idx'),
+        ]
+
+
+class ArchivedAttendance(models.Model):
+    # Keeps the id the row had in Attendance.
+    id = models.BigIntegerField(primary_key=True)
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='archived_attendance')
+    check_in_time = models.DateTimeField()
+    check_out_time = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.member} - {self.check_in_time.strftime('%Y-%m-%d %H:%M')}"
+    
+    class Meta:
+        ordering = ['-check_in_time']
+        indexes = [
+            models.Index(fields=['member', '-check_in_time'], name='gym_archived_member_time_idx'),
+            models.Index(fields=['check_in_time'], name='gym_archived_time_idx'),
+        ]
+
+
+class HourlyVisits(models.Model):
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    visits = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.date} {self.hour:02d}:00 - {self.visits} visits"
+    
+    class Meta:
+        ordering = ['date', 'hour']
+        unique_together = ['date', 'hour']
+        verbose_name = 'Hourly Visits'
+        verbose_name_plural = 'Hourly Visits'
+
+
+class MemberMonthlyVisits(models.Model):
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='monthly_visits')
+    month = models.DateField()
+    visits = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.member} - {self.month:%B %Y}: {self.visits} visits"
+    
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['member', 'month']
+        indexes = [
+            models.Index(fields=['-month', '-id'], name='gym_monthly_month_idx'),
+        ]
+        verbose_name = 'Member Monthly Visits'
+        verbose_name_plural = 'Member Monthly Visits'
 
 
 class GymEvent(models.Model):
@@ -125,6 +294,10 @@ class GymEvent(models.Model):
     
     class Meta:
         ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['date', 'is_active'], name='gym_event_date_active_idx'),
+            models.Index(fields=['date', 'start_time'], condition=Q(is_active=True), name='gym_event_active_date_idx'),
+        ]
 
 
 class SpecialHours(models.Model):
@@ -146,5 +319,8 @@ class SpecialHours(models.Model):
     
     class Meta:
         ordering = ['date']
+        indexes = [
+            models.Index(fields=['date'], name='gym_specialhours_date_idx'),
+        ]
         verbose_name = 'Special Hours'
         verbose_name_plural = 'Special Hours'
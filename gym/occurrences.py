@@ -0,0 +1,76 @@
+"""Dated sessions of the weekly classes, generated a rolling horizon ahead.
+
+``GymClass`` describes a weekly slot; ``ClassOccurrence`` rows are the
+concrete sessions members register for. ``generate`` fills in missing
+sessions for the next ``GYM_OCCURRENCE_WEEKS`` weeks and is run daily by the
+``generate_occurrences`` command. ``reschedule`` keeps one class's future
+sessions in step after it is edited.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import reservations
+from .models import ClassOccurrence, GymClass
+
+
+def class_dates(gym_class, start, end):
+    """Dates in ``[start, end)`` that fall on ``gym_class``'s weekday."""
+    day = start + timedelta(days=(gym_class.day_of_week - start.weekday()) % 7)
+    dates = []
+    while day < end:
+        dates.append(day)
+        day += timedelta(weeks=1)
+    return dates
+
+
+def generate(weeks=None, start=None, classes=None):
+    """Create the missing sessions of active ``classes`` from ``start`` for ``weeks``.
+
+    Returns the number of sessions created.
+    """
+    weeks = settings.GYM_OCCURRENCE_WEEKS if weeks is None else weeks
+    start = start or timezone.localdate()
+    end = start + timedelta(weeks=weeks)
+    classes = list(GymClass.objects.filter(is_active=True) if classes is None else classes)
+
+    existing = set(ClassOccurrence.objects.filter(
+        gym_class__in=classes, date__gte=start, date__lt=end,
+    ).values_list('gym_class_id', 'date'))
+    missing = [
+        ClassOccurrence(gym_class=gym_class, date=day, start_time=gym_class.start_time, capacity=gym_class.capacity)
+        for gym_class in classes
+        for day in class_dates(gym_class, start, end)
+        if (gym_class.pk, day) not in existing
+    ]
+    # A concurrent run may have created some of these; skip those quietly.
+    ClassOccurrence.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+    return len(missing)
+
+
+def reschedule(gym_class):
+    """Bring ``gym_class``'s upcoming sessions in line with its current settings.
+
+    Time and capacity are copied forward. Sessions left on the wrong weekday,
+    or belonging to a class that is no longer active, are deleted if nobody
+    booked them and cancelled otherwise, so bookings are never lost silently.
+    Cancelled sessions back on the class's weekday are reopened, with their
+    bookings, once the class is active.
+    """
+    upcoming = ClassOccurrence.objects.filter(gym_class=gym_class, date__gte=timezone.localdate())
+    upcoming.update(start_time=gym_class.start_time, capacity=gym_class.capacity)
+
+    on_weekday = Q(date__iso_week_day=gym_class.day_of_week + 1)
+    stale = upcoming if not gym_class.is_active else upcoming.exclude(on_weekday)
+    stale.filter(seats_taken=0, waitlist_length=0).delete()
+    stale.update(is_cancelled=True)
+    if gym_class.is_active:
+        upcoming.filter(on_weekday, is_cancelled=True).update(is_cancelled=False)
+        # A raised capacity goes to the waitlists first.
+        for occurrence in upcoming.filter(is_cancelled=False, waitlist_length__gt=0, seats_taken__lt=F('capacity')):
+            reservations.fill_free_seats(occurrence)
+
+    if gym_class.is_active:
+        generate(classes=[gym_class])
@@ -0,0 +1,124 @@
+import hashlib
+import time
+from datetime import datetime, time as dt_time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(model):
+    return f'gym:pagecache:version:{model._meta.label_lower}'
+
+
+def touch(*models):
+    """Mark ``models`` as changed so pages built from them are rebuilt."""
+    now = time.time()
+    cache.set_many({_version_key(model): now for model in models}, None)
+
+
+def model_versions(models):
+    """Return the current change version (a timestamp) of each model."""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _start_of_today():
+    today = timezone.localdate()
+    return timezone.make_aware(datetime.combine(today, dt_time.min)).timestamp()
+
+
+def _cacheable(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    return not get_messages(request)
+
+
+def _page_key(request, models):
+    versions = model_versions(models)
+    last_modified = int(max(versions + [_start_of_today()]))
+    fingerprint = f'{request.get_full_path()}|{timezone.localdate()}|{versions}'
+    return 'gym:pagecache:page:' + hashlib.md5(fingerprint.encode()).hexdigest(), last_modified
+
+
+def _entry_for(response):
+    if response.status_code != 200 or response.streaming or response.has_header('Set-Cookie'):
+        return None
+    content = response.content
+    return {
+        'content': content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.md5(content).hexdigest()),
+    }
+
+
+def _finish(request, response, entry, last_modified):
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=last_modified, response=response,
+    )
+
+
+def anonymous_page_cache(*models, timeout=PAGE_CACHE_TIMEOUT):
+    """Serve anonymous GETs from a rendered-page cache.
+
+    Entries are keyed by full path, today's date and the change version of
+    every model in ``models``; bumping a version through ``touch()`` makes
+    the old entries unreachable. Responses carry ``ETag`` and
+    ``Last-Modified`` so browsers can revalidate with a 304. Works on both
+    sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if not await sync_to_async(_cacheable)(request):
+                    return await view_func(request, *args, **kwargs)
+
+                key, last_modified = await sync_to_async(_page_key)(request, models)
+                entry = await cache.aget(key)
+                if entry is None:
+                    response = await view_func(request, *args, **kwargs)
+                    entry = _entry_for(response)
+                    if entry is None:
+                        return response
+                    await cache.aset(key, entry, timeout)
+                else:
+                    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+                return _finish(request, response, entry, last_modified)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            key, last_modified = _page_key(request, models)
+            entry = cache.get(key)
+            if entry is None:
+                response = view_func(request, *args, **kwargs)
+                entry = _entry_for(response)
+                if entry is None:
+                    return response
+                cache.set(key, entry, timeout)
+            else:
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+            return _finish(request, response, entry, last_modified)
+        return wrapper
+    return decorator
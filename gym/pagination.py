@@ -0,0 +1,84 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class KeysetPage:
+    """A page of rows ordered newest first on ``(date_joined, id)``.
+
+    Instead of an OFFSET the next page starts strictly after the last row of
+    this one, so every page costs the same no matter how deep it is.
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(date_joined, pk):
+    raw = f'{date_joined.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date_joined, pk = raw.split('|')
+        return datetime.fromisoformat(date_joined), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def paginate_by_date_joined(queryset, cursor=None, per_page=50, before=None):
+    """Return the page after ``cursor``, or the page before ``before``.
+
+    A cursor that does not decode is ignored, giving the first page.
+    """
+    position = decode_cursor(before) if before else None
+    if position:
+        date_joined, pk = position
+        newer = queryset.filter(Q(date_joined__gt=date_joined) | Q(date_joined=date_joined, pk__gt=pk))
+        # Walk back from the cursor, then put the page in display order.
+        rows = list(newer.order_by('date_joined', 'pk')[:per_page + 1])
+        if rows:
+            more = len(rows) > per_page
+            rows = rows[:per_page][::-1]
+            return KeysetPage(
+                rows,
+                encode_cursor(rows[-1].date_joined, rows[-1].pk),
+                encode_cursor(rows[0].date_joined, rows[0].pk) if more else None,
+            )
+
+    queryset = queryset.order_by('-date_joined', '-pk')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        date_joined, pk = position
+        queryset = queryset.filter(Q(date_joined__lt=date_joined) | Q(date_joined=date_joined, pk__lt=pk))
+
+    rows = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date_joined, last.pk)
+    previous_cursor = None
+    if position and rows:
+        previous_cursor = encode_cursor(rows[0].date_joined, rows[0].pk)
+    return KeysetPage(rows, next_cursor, previous_cursor)
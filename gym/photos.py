@@ -0,0 +1,113 @@
+"""Resized, recompressed variants of instructor photos.
+
+``Instructor.photo`` names an original in the default storage (under
+``MEDIA_ROOT``). For each one we write WebP and JPEG copies at a few widths
+under ``instructors/variants/``, with a hash of the encoded bytes in every
+filename. A URL therefore never changes meaning and can be cached for a
+year. The generated names are recorded in ``Instructor.photo_variants`` so
+templates can build ``srcset`` without touching the filesystem.
+
+Pillow is optional: without it, pages fall back to the original photo, the
+admin refuses new uploads and ``manage.py check`` warns (gym.W001).
+"""
+import hashlib
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.views.static import serve as static_serve
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+WIDTHS = (96, 320, 640)
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+UPLOAD_DIR = 'instructors'
+VARIANTS_DIR = 'instructors/variants'
+ONE_YEAR = 60 * 60 * 24 * 365
+
+
+def available():
+    return Image is not None
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _encode(image, width, options):
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def build_variants(photo, storage=default_storage):
+    """Write the variants of the original stored at ``photo`` and describe them.
+
+    Widths above the original's are skipped rather than upscaled; if the
+    original is narrower than every width it gets one variant at its own size.
+    """
+    with storage.open(photo, 'rb') as original:
+        data = original.read()
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    image = image.convert('RGB')
+    widths = [w for w in WIDTHS if w <= image.width] or [image.width]
+
+    stem = posixpath.splitext(posixpath.basename(photo))[0]
+    variants = {'photo': photo, 'source': _digest(data)[:16], 'width': image.width, 'height': image.height}
+    for ext, options in FORMATS.items():
+        variants[ext] = []
+        for width in widths:
+            encoded = _encode(image, width, options)
+            name = f'{VARIANTS_DIR}/{stem}-{width}.{_digest(encoded)[:12]}.{ext}'
+            if not storage.exists(name):
+                storage.save(name, ContentFile(encoded))
+            variants[ext].append([width, name])
+    return variants
+
+
+def variant_names(variants):
+    return {name for ext in FORMATS for _, name in variants.get(ext, [])}
+
+
+def refresh(instructor, force=False, storage=default_storage):
+    """Bring ``instructor.photo_variants`` in line with ``instructor.photo``.
+
+    Returns True if the variants changed. Files no longer referenced are
+    deleted, so stale variants don't pile up.
+    """
+    current = instructor.photo_variants or {}
+    if not force and current.get('photo') == instructor.photo:
+        return False
+    if instructor.photo and not available():
+        return False
+
+    updated = build_variants(instructor.photo, storage) if instructor.photo else {}
+    for name in variant_names(current) - variant_names(updated):
+        storage.delete(name)
+    if updated == current:
+        return False
+    type(instructor).objects.filter(pk=instructor.pk).update(photo_variants=updated)
+    instructor.photo_variants = updated
+    return True
+
+
+def srcset(variants, ext):
+    return ', '.join(f'{default_storage.url(name)} {width}w' for width, name in variants.get(ext, []))
+
+
+def serve(request, path):
+    """Serve ``MEDIA_ROOT``; variants are content-hashed, so cache them for a year."""
+    response = static_serve(request, path, document_root=settings.MEDIA_ROOT)
+    if path.startswith(VARIANTS_DIR + '/'):
+        response['Cache-Control'] = f'public, max-age={ONE_YEAR}, immutable'
+    return response
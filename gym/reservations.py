@@ -0,0 +1,211 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import live, pagecache
+from .models import ClassOccurrence, ClassRegistration, WaitlistEntry
+
+
+class ReservationError(Exception):
+    pass
+
+
+class ClassFull(ReservationError):
+    pass
+
+
+class AlreadyRegistered(ReservationError):
+    pass
+
+
+class AlreadyWaitlisted(ReservationError):
+    pass
+
+
+class OccurrenceClosed(ReservationError):
+    pass
+
+
+def reserve_seat(member, occurrence):
+    """Claim a seat in ``occurrence`` for ``member``.
+
+    The seat is taken with a single guarded UPDATE on
+    ``ClassOccurrence.seats_taken`` so concurrent requests can never push a
+    session over capacity. While anyone is waiting, free seats go to the
+    waitlist in order instead. Returns True for a new registration and False
+    when a cancelled one was re-activated.
+    """
+    if not occurrence.is_open():
+        raise OccurrenceClosed(occurrence)
+    with transaction.atomic():
+        claimed = ClassOccurrence.objects.filter(
+            pk=occurrence.pk, seats_taken__lt=F('capacity'), waitlist_length=0,
+        ).update(seats_taken=F('seats_taken') + 1)
+        if claimed:
+            return _register(member, occurrence)
+    if member.pk in fill_free_seats(occurrence):
+        return True
+    raise ClassFull(occurrence)
+
+
+def _register(member, occurrence):
+    # The caller has claimed the seat; nobody was waiting for it.
+    transaction.on_commit(lambda: pagecache.touch(ClassOccurrence))
+    live.class_changed()
+
+    reactivated = ClassRegistration.objects.filter(
+        member=member, occurrence=occurrence, is_cancelled=True,
+    ).update(is_cancelled=False, registered_at=timezone.now())
+    if reactivated:
+        return False
+
+    try:
+        with transaction.atomic():
+            ClassRegistration.objects.create(
+                member=member, gym_class_id=occurrence.gym_class_id, occurrence=occurrence,
+            )
+    except IntegrityError:
+        # Raising rolls back the seat claimed above.
+        raise AlreadyRegistered(occurrence)
+    return True
+
+
+def cancel_seat(member, occurrence):
+    """Cancel ``member``'s registration and release its seat.
+
+    Returns False if there was no active registration to cancel.
+    """
+    with transaction.atomic():
+        cancelled = ClassRegistration.objects.filter(
+            member=member, occurrence=occurrence, is_cancelled=False,
+        ).update(is_cancelled=True)
+        if not cancelled:
+            return False
+        transaction.on_commit(lambda: pagecache.touch(ClassOccurrence))
+        live.class_changed()
+        if not occurrence.is_open() or promote_waitlist(occurrence) is None:
+            ClassOccurrence.objects.filter(
+                pk=occurrence.pk, seats_taken__gt=0,
+            ).update(seats_taken=F('seats_taken') - 1)
+        return True
+
+
+def join_waitlist(member, occurrence):
+    """Queue ``member`` for the next free seat in ``occurrence``.
+
+    If a seat is free by now it is reserved instead and None is returned;
+    otherwise returns the member's place in line.
+    """
+    with transaction.atomic():
+        try:
+            reserve_seat(member, occurrence)
+        except ClassFull:
+            pass
+        else:
+            return None
+        if ClassRegistration.objects.filter(member=member, occurrence=occurrence, is_cancelled=False).exists():
+            raise AlreadyRegistered(occurrence)
+
+        # Bumping the length first takes the write lock, so concurrent joins
+        # cannot read the same tail position.
+        ClassOccurrence.objects.filter(pk=occurrence.pk).update(waitlist_length=F('waitlist_length') + 1)
+        tail = WaitlistEntry.objects.filter(occurrence=occurrence).aggregate(tail=Max('position'))['tail'] or 0
+        try:
+            with transaction.atomic():
+                WaitlistEntry.objects.create(member=member, occurrence=occurrence, position=tail + 1)
+        except IntegrityError:
+            raise AlreadyWaitlisted(occurrence)
+        return waitlist_place(member, occurrence)
+
+
+def leave_waitlist(member, occurrence):
+    """Take ``member`` off the waitlist. Returns False if they were not on it."""
+    with transaction.atomic():
+        entry = WaitlistEntry.objects.filter(member=member, occurrence=occurrence).values_list('pk', 'position').first()
+        if entry is None or not WaitlistEntry.objects.filter(pk=entry[0]).delete()[0]:
+            return False
+        # Close the gap so places stay a simple offset from the head.
+        WaitlistEntry.objects.filter(
+            occurrence=occurrence, position__gt=entry[1],
+        ).update(position=F('position') - 1)
+        ClassOccurrence.objects.filter(
+            pk=occurrence.pk, waitlist_length__gt=0,
+        ).update(waitlist_length=F('waitlist_length') - 1)
+        return True
+
+
+def waitlist_place(member, occurrence):
+    """Return ``member``'s 1-based place in line, or None if not waiting.
+
+    Positions are contiguous, so this is two index lookups rather than a
+    COUNT of the entries ahead.
+    """
+    entries = WaitlistEntry.objects.filter(occurrence=occurrence)
+    position = entries.filter(member=member).values_list('position', flat=True).first()
+    if position is None:
+        return None
+    head = entries.order_by('position').values_list('position', flat=True).first()
+    return position - head + 1
+
+
+def promote_waitlist(occurrence):
+    """Hand a just-released seat in ``occurrence`` to the head of its waitlist.
+
+    Must run inside the transaction that released the seat, which keeps
+    ``seats_taken`` unchanged. Returns the promoted member's id, or None if
+    nobody was waiting and the seat should be released.
+    """
+    while True:
+        head = WaitlistEntry.objects.filter(occurrence=occurrence).order_by('position').values_list('pk', 'member_id').first()
+        if head is None:
+            return None
+        entry_id, member_id = head
+        WaitlistEntry.objects.filter(pk=entry_id).delete()
+        ClassOccurrence.objects.filter(
+            pk=occurrence.pk, waitlist_length__gt=0,
+        ).update(waitlist_length=F('waitlist_length') - 1)
+
+        reactivated = ClassRegistration.objects.filter(
+            member_id=member_id, occurrence=occurrence, is_cancelled=True,
+        ).update(is_cancelled=False, registered_at=timezone.now())
+        if reactivated:
+            return member_id
+        try:
+            with transaction.atomic():
+                ClassRegistration.objects.create(
+                    member_id=member_id, gym_class_id=occurrence.gym_class_id, occurrence=occurrence,
+                )
+        except IntegrityError:
+            # Already holds a seat; offer this one to the next in line.
+            continue
+        return member_id
+
+
+def fill_free_seats(occurrence):
+    """Promote waitlisted members into any free seats in ``occurrence``.
+
+    For seats that open up without a cancellation, such as a raised
+    capacity. Each seat is claimed with the same guarded UPDATE as
+    ``reserve_seat`` and handed on by ``promote_waitlist``. Returns the
+    promoted members' ids.
+    """
+    if not occurrence.is_open():
+        return []
+    promoted = []
+    with transaction.atomic():
+        while ClassOccurrence.objects.filter(
+            pk=occurrence.pk, seats_taken__lt=F('capacity'), waitlist_length__gt=0,
+        ).update(seats_taken=F('seats_taken') + 1):
+            member_id = promote_waitlist(occurrence)
+            if member_id is None:
+                # The queue is empty; entries deleted along with their member
+                # leave the count behind, so reset it too.
+                ClassOccurrence.objects.filter(pk=occurrence.pk).update(
+                    seats_taken=F('seats_taken') - 1, waitlist_length=0,
+                )
+                break
+            promoted.append(member_id)
+        if promoted:
+            transaction.on_commit(lambda: pagecache.touch(ClassOccurrence))
+            live.class_changed()
+    return promoted
@@ -0,0 +1,128 @@
+"""Visit rollups maintained from Attendance.
+
+``HourlyVisits`` counts check-ins per local (date, hour) and
+``MemberMonthlyVisits`` per (member, month). Both are kept current by
+``add_visits()``, which the Attendance signals and the bulk ingestion
+paths call, and can be recomputed for any date range with
+``rebuild()`` (``manage.py rebuild_rollups``). Check-ins moved to
+``ArchivedAttendance`` keep counting.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, F
+from django.db.models.functions import ExtractHour, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import ArchivedAttendance, Attendance, HourlyVisits, MemberMonthlyVisits
+
+
+def _upsert(model, key_fields, counts):
+    """Add ``counts`` ({key tuple: n}) to ``model.visits``, creating rows as needed."""
+    for key, n in list(counts.items()):
+        if n < 0:
+            # Removals only ever touch rows that exist; the insert half of an
+            # upsert would trip the column's non-negative check.
+            lookup = dict(zip(key_fields, key))
+            model.objects.filter(visits__gte=-n, **lookup).update(visits=F('visits') + n)
+        if n <= 0:
+            del counts[key]
+    if not counts:
+        return
+    if connection.features.supports_update_conflicts_with_target:
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = [connection.ops.quote_name(model._meta.get_field(f).column) for f in key_fields]
+        visits = connection.ops.quote_name('visits')
+        sql = (
+            f'INSERT INTO {table} ({", ".join(columns)}, {visits}) '
+            f'VALUES ({", ".join(["%s"] * (len(columns) + 1))}) '
+            f'ON CONFLICT ({", ".join(columns)}) '
+            f'DO UPDATE SET {visits} = {table}.{visits} + excluded.{visits}'
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [(*key, n) for key, n in counts.items()])
+        return
+    for key, n in counts.items():
+        lookup = dict(zip(key_fields, key))
+        if not model.objects.filter(**lookup).update(visits=F('visits') + n):
+            model.objects.create(visits=n, **lookup)
+
+
+def add_visits(records, sign=1):
+    """Fold Attendance ``records`` into the rollups (``sign=-1`` removes them)."""
+    hourly = Counter()
+    monthly = Counter()
+    for record in records:
+        local = timezone.localtime(record.check_in_time)
+        hourly[(local.date(), local.hour)] += sign
+        monthly[(record.member_id, local.date().replace(day=1))] += sign
+    with transaction.atomic():
+        _upsert(HourlyVisits, ['date', 'hour'], hourly)
+        _upsert(MemberMonthlyVisits, ['member', 'month'], monthly)
+
+
+def _local_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _insert_select(model, columns, queryset):
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_sql = ', '.join(connection.ops.quote_name(model._meta.get_field(c).column) for c in columns)
+    select_sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {table} ({column_sql}) {select_sql}', params)
+
+
+def _hourly_counts(model, start, end):
+    return (
+        model.objects
+        .filter(check_in_time__gte=_local_start(start), check_in_time__lt=_local_start(end + timedelta(days=1)))
+        .order_by()
+        .annotate(day=TruncDate('check_in_time'), hour_of_day=ExtractHour('check_in_time'))
+        .values('day', 'hour_of_day')
+        .annotate(total=Count('pk'))
+        .values_list('day', 'hour_of_day', 'total')
+    )
+
+
+def _monthly_counts(model, month_start, month_end):
+    return (
+        model.objects
+        .filter(check_in_time__gte=_local_start(month_start), check_in_time__lt=_local_start(month_end))
+        .order_by()
+        .annotate(visit_month=TruncMonth('check_in_time', output_field=DateField()))
+        .values('member', 'visit_month')
+        .annotate(total=Count('pk'))
+        .values_list('member', 'visit_month', 'total')
+    )
+
+
+def rebuild(start, end):
+    """Recompute the rollups for local dates ``start``..``end`` inclusive.
+
+    Monthly rows are rebuilt for every month the range touches, so the
+    range is widened to whole months for them.
+    """
+    month_start = start.replace(day=1)
+    month_end = (end.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+    with transaction.atomic():
+        HourlyVisits.objects.filter(date__range=(start, end)).delete()
+        _insert_select(HourlyVisits, ['date', 'hour', 'visits'], _hourly_counts(Attendance, start, end))
+        archived = _hourly_counts(ArchivedAttendance, start, end)
+        _upsert(HourlyVisits, ['date', 'hour'], Counter({(day, hour): total for day, hour, total in archived}))
+
+        MemberMonthlyVisits.objects.filter(month__gte=month_start, month__lt=month_end).delete()
+        _insert_select(MemberMonthlyVisits, ['member', 'month', 'visits'], _monthly_counts(Attendance, month_start, month_end))
+        archived = _monthly_counts(ArchivedAttendance, month_start, month_end)
+        _upsert(MemberMonthlyVisits, ['member', 'month'], Counter({(member, month): total for member, month, total in archived}))
+
+
+def weekday_hour_heatmap(start, end):
+    """Return visits as ``{(weekday, hour): visits}`` with Monday = 0."""
+    heatmap = Counter()
+    rows = HourlyVisits.objects.filter(date__range=(start, end)).values_list('date', 'hour', 'visits')
+    for day, hour, visits in rows:
+        heatmap[(day.weekday(), hour)] += visits
+    return heatmap
@@ -0,0 +1,197 @@
+"""Full-text search over members, classes and instructors.
+
+On SQLite builds with FTS5 the searchable text of every row lives in one
+``gym_search`` virtual table with a prefix index, so a lookup is a single
+index probe instead of a ``LIKE '%...%'`` scan per column. A row's rowid
+packs the source pk and kind (``pk * 4 + code``), which lets a single row be
+replaced or deleted by rowid.
+
+Rows are written by the same ``INSERT ... SELECT`` whether one object
+changed (``index``, from signals), a batch was bulk-written (``index_pks``,
+in the same transaction) or the whole index is rebuilt (``rebuild``, from
+the ``rebuild_search_index`` command).
+
+Other backends, and SQLite without FTS5, get ``enabled() == False``:
+autocomplete falls back to ``istartswith`` queries and the admin to its
+``search_fields``.
+"""
+import re
+
+from django.apps import apps
+from django.db import OperationalError, connections, router, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'gym_search'
+MAX_TERMS = 8
+AUTOCOMPLETE_LIMIT = 10
+CANDIDATES = 200
+
+# kind -> rowid code, model, the SQL producing its (rowid, label, text,
+# active) rows, and the columns the fallback matches and labels with.
+SOURCES = {
+    'member': {
+        'code': 1,
+        'model': 'gym.Member',
+        'select': (
+            "SELECT id * 4 + 1, first_name || ' ' || last_name, "
+            "first_name || ' ' || last_name || ' ' || email || ' ' || phone, is_active FROM gym_member"
+        ),
+        'fields': ['first_name', 'last_name', 'email'],
+        'label': ['first_name', 'last_name'],
+    },
+    'class': {
+        'code': 2,
+        'model': 'gym.GymClass',
+        'select': "SELECT id * 4 + 2, name, name, is_active FROM gym_gymclass",
+        'fields': ['name'],
+        'label': ['name'],
+    },
+    'instructor': {
+        'code': 3,
+        'model': 'gym.Instructor',
+        'select': "SELECT id * 4 + 3, name, name || ' ' || specialty, 1 FROM gym_instructor",
+        'fields': ['name', 'specialty'],
+        'label': ['name'],
+    },
+}
+KINDS_BY_MODEL = {source['model'].lower(): kind for kind, source in SOURCES.items()}
+
+_enabled = {}
+
+
+def create_table(connection):
+    """Create the FTS5 table; returns False where FTS5 is unavailable."""
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                "label UNINDEXED, text, active UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+    except OperationalError:
+        return False
+    reset()
+    return True
+
+
+def reset():
+    """Forget which databases have the index, e.g. after migrations."""
+    _enabled.clear()
+
+
+def enabled(using='default'):
+    connection = connections[using]
+    key = (using, connection.settings_dict['NAME'])
+    if key not in _enabled:
+        _enabled[key] = connection.vendor == 'sqlite' and TABLE in connection.introspection.table_names()
+    return _enabled[key]
+
+
+def rebuild(connection):
+    # One transaction, so searches keep seeing the old rows until it commits.
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for source in SOURCES.values():
+            cursor.execute(f"INSERT INTO {TABLE} (rowid, label, text, active) {source['select']}")
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {TABLE}')
+        return cursor.fetchone()[0]
+
+
+def _rowid(kind, pk):
+    return pk * 4 + SOURCES[kind]['code']
+
+
+def index(instance, using='default'):
+    index_pks(KINDS_BY_MODEL[instance._meta.label_lower], [instance.pk], using)
+
+
+def index_pks(kind, pks, using='default'):
+    """(Re)index the rows of ``kind`` with these pks, e.g. after a bulk write."""
+    pks = list(pks)
+    if not pks or not enabled(using):
+        return
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {TABLE} WHERE rowid IN ({placeholders})', [_rowid(kind, pk) for pk in pks],
+        )
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, label, text, active) {SOURCES[kind]['select']} WHERE id IN ({placeholders})",
+            pks,
+        )
+
+
+def remove(instance, using='default'):
+    kind = KINDS_BY_MODEL[instance._meta.label_lower]
+    if enabled(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [_rowid(kind, instance.pk)])
+
+
+def match_expression(text):
+    """Turn user input into an FTS5 query: every word, as a prefix, must match."""
+    terms = re.findall(r'\w+', text.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def matching(kind, text):
+    """SQL for the pks of ``kind`` matching ``text``, to use as ``pk__in=``."""
+    return RawSQL(
+        f'SELECT rowid / 4 FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid %% 4 = %s',
+        (match_expression(text), SOURCES[kind]['code']),
+    )
+
+
+def filter_q(lookups, text):
+    """OR of ``<lookup>__in`` the matches of each ``(lookup, kind)`` pair."""
+    q = Q()
+    for lookup, kind in lookups:
+        q |= Q(**{f'{lookup}__in': matching(kind, text)})
+    return q
+
+
+def autocomplete(text, kinds=None, limit=AUTOCOMPLETE_LIMIT):
+    """Best matches for a partly typed ``text`` as ``{'kind', 'id', 'label'}`` dicts.
+
+    Only active members and classes are suggested.
+    """
+    kinds = [kind for kind in (kinds or SOURCES) if kind in SOURCES]
+    expression = match_expression(text)
+    if not expression or not kinds:
+        return []
+
+    using = router.db_for_read(apps.get_model(SOURCES[kinds[0]]['model']))
+    if not enabled(using):
+        return _autocomplete_fallback(text, kinds, limit, using)
+    codes = {SOURCES[kind]['code']: kind for kind in kinds}
+    # Ranking every match of a short, common prefix is what makes it slow,
+    # so only the first CANDIDATES matches are ranked.
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, label, rank FROM {TABLE} WHERE {TABLE} MATCH %s AND active = 1 '
+            f'AND rowid %% 4 IN ({", ".join("%s" for _ in codes)}) LIMIT %s',
+            [expression, *codes, CANDIDATES],
+        )
+        rows = sorted(cursor.fetchall(), key=lambda row: row[2])[:limit]
+    return [{'kind': codes[rowid % 4], 'id': rowid // 4, 'label': label} for rowid, label, _ in rows]
+
+
+def _autocomplete_fallback(text, kinds, limit, using):
+    results = []
+    for kind in kinds:
+        source = SOURCES[kind]
+        model = apps.get_model(source['model'])
+        rows = model.objects.using(using).all()
+        for term in re.findall(r'\w+', text)[:MAX_TERMS]:
+            rows = rows.filter(Q(*[(f'{field}__istartswith', term) for field in source['fields']], _connector=Q.OR))
+        if any(field.name == 'is_active' for field in model._meta.fields):
+            rows = rows.filter(is_active=True)
+        for row in rows.values_list('pk', *source['label'])[:limit - len(results)]:
+            results.append({'kind': kind, 'id': row[0], 'label': ' '.join(row[1:])})
+        if len(results) >= limit:
+            break
+    return results
@@ -0,0 +1,145 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.db.models import F, QuerySet
+from django.dispatch import receiver
+
+from . import calendars, live, occurrences, pagecache, photos, reservations, rollups, search, stats
+from .models import ArchivedAttendance, Attendance, ClassOccurrence, ClassRegistration, GymClass, GymEvent, Instructor, Member, SpecialHours
+
+
+@receiver(pre_save, sender=GymEvent)
+@receiver(pre_save, sender=SpecialHours)
+def remember_calendar_date(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_date = sender.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=GymEvent)
+@receiver(post_save, sender=SpecialHours)
+@receiver(post_delete, sender=GymEvent)
+@receiver(post_delete, sender=SpecialHours)
+def invalidate_calendar(sender, instance, **kwargs):
+    calendars.invalidate_date(instance.date)
+    previous = getattr(instance, '_previous_date', None)
+    if previous and previous != instance.date:
+        calendars.invalidate_date(previous)
+
+
+@receiver(post_delete, sender=ClassRegistration)
+def release_deleted_seat(sender, instance, origin=None, **kwargs):
+    if instance.is_cancelled or not instance.occurrence_id:
+        return
+    occurrence = ClassOccurrence.objects.filter(pk=instance.occurrence_id).first()
+    if occurrence is None:
+        return
+    # A deleted session or class takes its waitlist with it.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if occurrence.is_open() and origin_model not in (ClassOccurrence, GymClass):
+        if reservations.promote_waitlist(occurrence) is not None:
+            return
+    ClassOccurrence.objects.filter(
+        pk=occurrence.pk, seats_taken__gt=0,
+    ).update(seats_taken=F('seats_taken') - 1)
+
+
+@receiver(post_save, sender=GymClass)
+def reschedule_occurrences(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    def reschedule():
+        occurrences.reschedule(instance)
+        pagecache.touch(ClassOccurrence)
+        live.broadcaster.wake()
+    transaction.on_commit(reschedule)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=GymClass)
+@receiver(post_delete, sender=Member)
+@receiver(post_delete, sender=GymClass)
+def invalidate_stats(sender, **kwargs):
+    stats.invalidate(sender)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=GymClass)
+@receiver(post_save, sender=Instructor)
+def index_for_search(sender, instance, using, **kwargs):
+    search.index(instance, using)
+
+
+@receiver(post_delete, sender=Member)
+@receiver(post_delete, sender=GymClass)
+@receiver(post_delete, sender=Instructor)
+def remove_from_search(sender, instance, using, **kwargs):
+    search.remove(instance, using)
+
+
+@receiver(post_migrate)
+def forget_search_tables(sender, **kwargs):
+    search.reset()
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=GymClass)
+@receiver(post_save, sender=Instructor)
+@receiver(post_save, sender=GymEvent)
+@receiver(post_save, sender=SpecialHours)
+@receiver(post_delete, sender=Member)
+@receiver(post_delete, sender=GymClass)
+@receiver(post_delete, sender=Instructor)
+@receiver(post_delete, sender=GymEvent)
+@receiver(post_delete, sender=SpecialHours)
+def expire_cached_pages(sender, using, **kwargs):
+    # After commit, or a concurrent request could cache the old data under
+    # the new version.
+    transaction.on_commit(lambda: pagecache.touch(sender), using=using)
+
+
+@receiver(post_save, sender=ClassRegistration)
+@receiver(post_save, sender=ClassOccurrence)
+@receiver(post_delete, sender=ClassRegistration)
+@receiver(post_delete, sender=ClassOccurrence)
+def expire_class_pages(sender, using, **kwargs):
+    # Registrations and session edits change the spots shown on class pages.
+    transaction.on_commit(lambda: pagecache.touch(ClassOccurrence), using=using)
+    live.class_changed()
+
+
+@receiver(post_save, sender=Instructor)
+def refresh_photo_variants(sender, instance, **kwargs):
+    def refresh():
+        try:
+            changed = photos.refresh(instance)
+        except OSError:
+            logging.getLogger('gym.photos').exception('Could not build photo variants for %s', instance.photo)
+            return
+        if changed:
+            pagecache.touch(Instructor)
+    transaction.on_commit(refresh)
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_visit(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_visit = sender.objects.filter(pk=instance.pk).only('member', 'check_in_time').first()
+
+
+@receiver(post_save, sender=Attendance)
+def add_visit_to_rollups(sender, instance, created, **kwargs):
+    if created:
+        rollups.add_visits([instance])
+        return
+    # An edited check-in moves from its old hour and month to the new ones.
+    previous = getattr(instance, '_previous_visit', None)
+    if previous and (previous.member_id, previous.check_in_time) != (instance.member_id, instance.check_in_time):
+        rollups.add_visits([previous], sign=-1)
+        rollups.add_visits([instance])
+
+
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=ArchivedAttendance)
+def remove_visit_from_rollups(sender, instance, **kwargs):
+    rollups.add_visits([instance], sign=-1)
@@ -0,0 +1,95 @@
+"""Fingerprinted, precompressed static files.
+
+``CompressedManifestStaticFilesStorage`` is Django's manifest storage plus a
+final pass in ``collectstatic`` that writes ``.gz`` (and ``.br``, if the
+``brotli`` package is installed) next to every compressible file.
+``gym.middleware.StaticFilesMiddleware`` serves the result.
+"""
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.json', '.map', '.svg', '.txt', '.html', '.xml', '.ico', '.ttf', '.otf', '.eot',
+}
+# Keep a compressed copy only if it is at least this much smaller.
+MIN_SAVING = 0.05
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def compressors():
+    yield 'gzip', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield 'br', lambda data: brotli.compress(data, quality=11)
+
+
+def compress(path):
+    """Write precompressed siblings of ``path``; return the encodings written."""
+    path = Path(path)
+    if path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    data = path.read_bytes()
+    written = []
+    for encoding, compressor in compressors():
+        target = path.with_name(path.name + ENCODINGS[encoding])
+        encoded = compressor(data)
+        if len(encoded) <= len(data) * (1 - MIN_SAVING):
+            target.write_bytes(encoded)
+            written.append(encoding)
+        elif target.exists():
+            target.unlink()
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if self.exists(name):
+                compress(self.path(name))
+
+
+class StaticFile:
+    __slots__ = ('path', 'content_type', 'size', 'mtime', 'immutable', 'encodings')
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type in ('application/javascript', 'application/json'):
+            self.content_type += '; charset=utf-8'
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.immutable = immutable
+        # Encoding -> (path, size) of each precompressed sibling.
+        self.encodings = {}
+        for encoding, suffix in ENCODINGS.items():
+            if os.path.exists(path + suffix):
+                self.encodings[encoding] = (path + suffix, os.path.getsize(path + suffix))
+
+
+def scan(root):
+    """Index the collected files under ``root`` by URL path.
+
+    Names listed as hashed in the manifest are marked immutable.
+    """
+    root = Path(root)
+    hashed = set(ManifestStaticFilesStorage(location=root).hashed_files.values())
+
+    files = {}
+    for path in root.rglob('*'):
+        name = path.relative_to(root).as_posix()
+        if path.is_dir() or path.suffix in ('.gz', '.br') or name == ManifestStaticFilesStorage.manifest_name:
+            continue
+        files[name] = StaticFile(str(path), name in hashed)
+    return files
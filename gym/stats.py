@@ -0,0 +1,166 @@
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import GymClass, Member
+
+STATS_CACHE_TIMEOUT = 60 * 60
+
+ACTIVE_MEMBER_COUNT = 'gym:stats:active_member_count'
+ACTIVE_MEMBER_COUNTS_BY_TYPE = 'gym:stats:active_member_counts_by_type'
+ACTIVE_CLASS_COUNT = 'gym:stats:active_class_count'
+RECENT_MEMBERS = 'gym:stats:recent_members'
+DASHBOARD_CLASSES = 'gym:stats:dashboard_classes'
+
+HITS = 'gym:stats:hits'
+MISSES = 'gym:stats:misses'
+
+# Hits and misses are tallied in memory and added to the shared cache
+# counters at most this often, so a cache hit costs no extra cache write.
+COUNTS_FLUSH_INTERVAL = 60
+
+# Which cached values depend on which model; used by the signal handlers.
+DEPENDENCIES = {
+    Member: [ACTIVE_MEMBER_COUNT, ACTIVE_MEMBER_COUNTS_BY_TYPE, RECENT_MEMBERS],
+    GymClass: [ACTIVE_CLASS_COUNT, DASHBOARD_CLASSES],
+}
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+_counts_flushed_at = time.monotonic()
+
+
+def _tally(key, force=False):
+    """Count ``key`` locally; returns the counts due to be flushed, if any."""
+    global _counts_flushed_at
+    with _counts_lock:
+        if key:
+            _counts[key] += 1
+        if not _counts or (not force and time.monotonic() - _counts_flushed_at < COUNTS_FLUSH_INTERVAL):
+            return None
+        _counts_flushed_at = time.monotonic()
+        due = dict(_counts)
+        _counts.clear()
+    return due
+
+
+def _flush(due):
+    for key, count in due.items():
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            if not cache.add(key, count, None):
+                cache.incr(key, count)
+
+
+async def _aflush(due):
+    for key, count in due.items():
+        try:
+            await cache.aincr(key, count)
+        except ValueError:
+            if not await cache.aadd(key, count, None):
+                await cache.aincr(key, count)
+
+
+def flush_counts():
+    due = _tally(None, force=True)
+    if due:
+        _flush(due)
+
+
+atexit.register(flush_counts)
+
+
+def _count(key):
+    due = _tally(key)
+    if due:
+        _flush(due)
+
+
+async def _acount(key):
+    due = _tally(key)
+    if due:
+        await _aflush(due)
+
+
+def cached(key, build):
+    value = cache.get(key)
+    if value is None:
+        _count(MISSES)
+        value = build()
+        cache.set(key, value, STATS_CACHE_TIMEOUT)
+    else:
+        _count(HITS)
+    return value
+
+
+async def acached(key, build):
+    value = await cache.aget(key)
+    if value is None:
+        await _acount(MISSES)
+        value = await build()
+        await cache.aset(key, value, STATS_CACHE_TIMEOUT)
+    else:
+        await _acount(HITS)
+    return value
+
+
+def cache_stats():
+    """Hits and misses across all processes.
+
+    Other processes' counts arrive up to ``COUNTS_FLUSH_INTERVAL`` late.
+    """
+    flush_counts()
+    counts = cache.get_many([HITS, MISSES])
+    return {'hits': counts.get(HITS, 0), 'misses': counts.get(MISSES, 0)}
+
+
+def invalidate(model):
+    cache.delete_many(DEPENDENCIES.get(model, []))
+
+
+def active_member_count():
+    return cached(ACTIVE_MEMBER_COUNT, Member.objects.filter(is_active=True).count)
+
+
+def active_member_count_by_type(membership_type):
+    def build():
+        rows = Member.objects.filter(is_active=True).values('membership_type').annotate(n=Count('pk'))
+        return {row['membership_type']: row['n'] for row in rows.order_by()}
+    return cached(ACTIVE_MEMBER_COUNTS_BY_TYPE, build).get(membership_type, 0)
+
+
+def active_class_count():
+    return cached(ACTIVE_CLASS_COUNT, GymClass.objects.filter(is_active=True).count)
+
+
+def recent_members():
+    return cached(RECENT_MEMBERS, lambda: list(Member.objects.filter(is_active=True)[:5]))
+
+
+def dashboard_classes():
+    return cached(DASHBOARD_CLASSES, lambda: list(GymClass.objects.filter(is_active=True)[:6]))
+
+
+async def aactive_member_count():
+    return await acached(ACTIVE_MEMBER_COUNT, Member.objects.filter(is_active=True).acount)
+
+
+async def aactive_class_count():
+    return await acached(ACTIVE_CLASS_COUNT, GymClass.objects.filter(is_active=True).acount)
+
+
+async def arecent_members():
+    async def build():
+        return [member async for member in Member.objects.filter(is_active=True)[:5]]
+    return await acached(RECENT_MEMBERS, build)
+
+
+async def adashboard_classes():
+    async def build():
+        return [gym_class async for gym_class in GymClass.objects.filter(is_active=True)[:6]]
+    return await acached(DASHBOARD_CLASSES, build)
@@ -0,0 +1,21 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+
+from ..admin import IndexedDates
+
+register = template.Library()
+
+
+class _IndexedChangeList:
+    def __init__(self, cl):
+        self._cl = cl
+        self.queryset = IndexedDates(cl.queryset, cl.date_hierarchy)
+
+    def __getattr__(self, name):
+        return getattr(self._cl, name)
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def indexed_date_hierarchy(cl):
+    """``{% date_hierarchy %}`` without full scans of the changelist's table."""
+    return date_hierarchy(_IndexedChangeList(cl))
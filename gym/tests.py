@@ -1,3 +1,975 @@
-from django.test import TestCase
+import base64
+import calendar
+import importlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import archive, checkins, checks, db, live, occurrences, pagecache, pagination, photos, reservations, search, stats, views
+from .admin import EstimatedCountPaginator, IndexedDates, estimated_row_count
+from .forms import InstructorAdminForm
+from .middleware import MemberMiddleware, QueryInstrumentationMiddleware, StaticFilesMiddleware
+from .models import ArchivedAttendance, Attendance, ClassOccurrence, ClassRegistration, GymClass, GymEvent, HourlyVisits, Instructor, Member, MemberMonthlyVisits, SpecialHours, WaitlistEntry
+
+
+def make_class(**kwargs):
+    defaults = {
+        'name': 'Yoga Basics',
+        'description': 'Fundamental poses.',
+        'day_of_week': 0,
+        'start_time': time(9, 0),
+        'capacity': 15,
+    }
+    defaults.update(kwargs)
+    return GymClass.objects.create(**defaults)
+
+
+def make_occurrence(gym_class=None, **kwargs):
+    gym_class = gym_class or make_class()
+    defaults = {
+        'date': date.today() + timedelta(days=7),
+        'start_time': gym_class.start_time,
+        'capacity': gym_class.capacity,
+    }
+    defaults.update(kwargs)
+    return ClassOccurrence.objects.create(gym_class=gym_class, **defaults)
+
+
+def make_members(count):
+    return Member.objects.bulk_create([
+        Member(first_name='Member', last_name=str(i), email=f'member{i}@example.com', phone='555-0100')
+        for i in range(count)
+    ])
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.session = make_occurrence(capacity=2)
+        self.alice, self.bob, self.carol = make_members(3)
+
+    def test_reserve_until_full(self):
+        self.assertTrue(reservations.reserve_seat(self.alice, self.session))
+        self.assertTrue(reservations.reserve_seat(self.bob, self.session))
+        with self.assertRaises(reservations.ClassFull):
+            reservations.reserve_seat(self.carol, self.session)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.seats_taken, 2)
+
+    def test_double_registration_does_not_take_a_second_seat(self):
+        reservations.reserve_seat(self.alice, self.session)
+        with self.assertRaises(reservations.AlreadyRegistered):
+            reservations.reserve_seat(self.alice, self.session)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.seats_taken, 1)
+
+    def test_cancel_releases_seat_and_reregister_reactivates(self):
+        reservations.reserve_seat(self.alice, self.session)
+        self.assertTrue(reservations.cancel_seat(self.alice, self.session))
+        self.assertFalse(reservations.cancel_seat(self.alice, self.session))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.seats_taken, 0)
+
+        self.assertFalse(reservations.reserve_seat(self.alice, self.session))
+        self.assertEqual(ClassRegistration.objects.filter(occurrence=self.session).count(), 1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.seats_taken, 1)
+
+    def test_past_and_cancelled_sessions_are_closed(self):
+        past = make_occurrence(self.session.gym_class, date=date.today() - timedelta(days=7))
+        with self.assertRaises(reservations.OccurrenceClosed):
+            reservations.reserve_seat(self.alice, past)
+        ClassOccurrence.objects.filter(pk=self.session.pk).update(is_cancelled=True)
+        self.session.refresh_from_db()
+        with self.assertRaises(reservations.OccurrenceClosed):
+            reservations.join_waitlist(self.alice, self.session)
+
+    def test_seats_are_per_session(self):
+        later = make_occurrence(self.session.gym_class, date=self.session.date + timedelta(weeks=1))
+        reservations.reserve_seat(self.alice, self.session)
+        self.assertTrue(reservations.reserve_seat(self.alice, later))
+        later.refresh_from_db()
+        self.assertEqual(later.seats_taken, 1)
+
+    def test_deleting_active_registration_releases_seat(self):
+        reservations.reserve_seat(self.alice, self.session)
+        self.alice.delete()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.seats_taken, 0)
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.session = make_occurrence(capacity=1)
+        self.alice, self.bob, self.carol, self.dave = make_members(4)
+        reservations.reserve_seat(self.alice, self.session)
+        self.session.refresh_from_db()
+
+    def test_join_returns_place_in_line(self):
+        self.assertEqual(reservations.join_waitlist(self.bob, self.session), 1)
+        self.assertEqual(reservations.join_waitlist(self.carol, self.session), 2)
+        with self.assertRaises(reservations.AlreadyWaitlisted):
+            reservations.join_waitlist(self.bob, self.session)
+        with self.assertRaises(reservations.AlreadyRegistered):
+            reservations.join_waitlist(self.alice, self.session)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.waitlist_length, 2)
+
+    def test_cancel_promotes_head_of_queue(self):
+        reservations.join_waitlist(self.bob, self.session)
+        reservations.join_waitlist(self.carol, self.session)
+        reservations.cancel_seat(self.alice, self.session)
+
+        self.assertTrue(ClassRegistration.objects.filter(member=self.bob, occurrence=self.session, is_cancelled=False).exists())
+        self.assertIsNone(reservations.waitlist_place(self.bob, self.session))
+        self.assertEqual(reservations.waitlist_place(self.carol, self.session), 1)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.seats_taken, self.session.waitlist_length), (1, 1))
+
+    def test_leaving_closes_the_gap(self):
+        for member in (self.bob, self.carol, self.dave):
+            reservations.join_waitlist(member, self.session)
+        self.assertTrue(reservations.leave_waitlist(self.carol, self.session))
+        self.assertFalse(reservations.leave_waitlist(self.carol, self.session))
+        self.assertEqual(reservations.waitlist_place(self.dave, self.session), 2)
+
+        reservations.cancel_seat(self.alice, self.session)
+        self.assertEqual(reservations.waitlist_place(self.dave, self.session), 1)
+        self.assertEqual(WaitlistEntry.objects.filter(occurrence=self.session).count(), 1)
+
+    def test_free_seat_is_reserved_instead_of_queued(self):
+        reservations.cancel_seat(self.alice, self.session)
+        self.session.refresh_from_db()
+        self.assertIsNone(reservations.join_waitlist(self.bob, self.session))
+        self.assertTrue(ClassRegistration.objects.filter(member=self.bob, is_cancelled=False).exists())
+
+    def test_deleted_registration_promotes_head_of_queue(self):
+        reservations.join_waitlist(self.bob, self.session)
+        reservations.join_waitlist(self.carol, self.session)
+        ClassRegistration.objects.get(member=self.alice).delete()
+        self.bob.delete()
+
+        self.assertTrue(ClassRegistration.objects.filter(member=self.carol, is_cancelled=False).exists())
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.seats_taken, self.session.waitlist_length), (1, 0))
+
+    def test_raised_capacity_promotes_the_waitlist(self):
+        gym_class = make_class(day_of_week=self.session.date.weekday(), capacity=1)
+        session = make_occurrence(gym_class, date=self.session.date)
+        for member in (self.alice, self.bob, self.carol, self.dave):
+            reservations.join_waitlist(member, session)
+
+        gym_class.capacity = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            gym_class.save()
+        session.refresh_from_db()
+        self.assertEqual((session.seats_taken, session.waitlist_length), (3, 1))
+        self.assertEqual(reservations.waitlist_place(self.dave, session), 1)
+
+
+    def test_free_seats_go_to_the_queue_before_new_bookings(self):
+        reservations.join_waitlist(self.bob, self.session)
+        ClassOccurrence.objects.filter(pk=self.session.pk).update(capacity=2)
+        with self.assertRaises(reservations.ClassFull):
+            reservations.reserve_seat(self.carol, self.session)
+        self.assertTrue(ClassRegistration.objects.filter(member=self.bob, is_cancelled=False).exists())
+        self.assertFalse(ClassRegistration.objects.filter(member=self.carol).exists())
+
+    def test_cancelling_a_past_session_promotes_nobody(self):
+        reservations.join_waitlist(self.bob, self.session)
+        self.session.date = date.today() - timedelta(days=1)
+        self.session.save()
+        reservations.cancel_seat(self.alice, self.session)
+        self.assertEqual(reservations.waitlist_place(self.bob, self.session), 1)
+
+    def test_admin_cancellation_promotes_and_refuses_overbooking(self):
+        reservations.join_waitlist(self.bob, self.session)
+        registration = ClassRegistration.objects.get(member=self.alice)
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        url = reverse('admin:gym_classregistration_change', args=[registration.pk])
+        registered_at = timezone.localtime(registration.registered_at)
+        data = {
+            'member': self.alice.pk, 'gym_class': registration.gym_class_id, 'occurrence': self.session.pk,
+            'registered_at_0': registered_at.date().isoformat(), 'registered_at_1': registered_at.strftime('%H:%M:%S'),
+            'is_cancelled': 'on',
+        }
+        self.assertEqual(self.client.post(url, data).status_code, 302)
+        self.assertTrue(ClassRegistration.objects.filter(member=self.bob, is_cancelled=False).exists())
+
+        del data['is_cancelled']
+        self.assertContains(self.client.post(url, data), 'no free seat')
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.seats_taken, self.session.waitlist_length), (1, 0))
+
+
+class OccurrenceTests(TestCase):
+    def test_generate_fills_the_horizon_once(self):
+        monday = date(2026, 10, 19)
+        gym_class = make_class(day_of_week=2)
+        make_class(name='Retired', is_active=False)
+        self.assertEqual(occurrences.generate(weeks=3, start=monday), 3)
+        self.assertEqual(occurrences.generate(weeks=3, start=monday), 0)
+        self.assertEqual(
+            list(gym_class.occurrences.values_list('date', flat=True)),
+            [date(2026, 10, 21), date(2026, 10, 28), date(2026, 11, 4)],
+        )
+
+    def test_reschedule_moves_empty_sessions_and_cancels_booked_ones(self):
+        gym_class = make_class(day_of_week=date.today().weekday())
+        occurrences.generate(weeks=2, classes=[gym_class])
+        booked, empty = gym_class.occurrences.all()
+        reservations.reserve_seat(make_members(1)[0], booked)
+
+        gym_class.day_of_week = (gym_class.day_of_week + 1) % 7
+        gym_class.capacity = 10
+        gym_class.save()
+        occurrences.reschedule(gym_class)
+
+        booked.refresh_from_db()
+        self.assertTrue(booked.is_cancelled)
+        self.assertFalse(ClassOccurrence.objects.filter(pk=empty.pk).exists())
+        moved = gym_class.occurrences.filter(is_cancelled=False)
+        self.assertTrue(moved.exists())
+        self.assertTrue(all(o.date.weekday() == gym_class.day_of_week and o.capacity == 10 for o in moved))
+
+    def test_reactivating_a_class_reopens_its_cancelled_sessions(self):
+        gym_class = make_class(day_of_week=(date.today().weekday() + 1) % 7)
+        occurrences.generate(weeks=2, classes=[gym_class])
+        session = gym_class.occurrences.first()
+        member = make_members(1)[0]
+        reservations.reserve_seat(member, session)
+
+        gym_class.is_active = False
+        gym_class.save()
+        occurrences.reschedule(gym_class)
+        session.refresh_from_db()
+        self.assertTrue(session.is_cancelled)
+        self.assertFalse(views._upcoming_registrations(member).exists())
+
+        gym_class.is_active = True
+        gym_class.save()
+        occurrences.reschedule(gym_class)
+        session.refresh_from_db()
+        self.assertFalse(session.is_cancelled)
+        self.assertEqual(list(views._upcoming_registrations(member).values_list('occurrence', flat=True)), [session.pk])
+
+
+class CheckInTests(TestCase):
+    def setUp(self):
+        self.member, self.other = make_members(2)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def entry(self, member, minutes_ago):
+        check_in_time = timezone.now().replace(microsecond=0) - timedelta(minutes=minutes_ago)
+        return {'member_id': member.pk, 'check_in_time': check_in_time.isoformat()}
+
+    def test_entries_already_stored_are_skipped(self):
+        first, second = self.entry(self.member, 30), self.entry(self.other, 20)
+        self.assertEqual(checkins.write_entries([first, first]), 1)
+        unknown = {'member_id': self.other.pk + 100, 'check_in_time': first['check_in_time']}
+        self.assertEqual(checkins.write_entries([first, second, unknown]), 1)
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertEqual(sum(HourlyVisits.objects.values_list('visits', flat=True)), 2)
+
+    def test_journals_of_dead_processes_are_replayed_once(self):
+        # Far above any pid_max, so no live process owns it.
+        dead = os.path.join(self.directory.name, '999999999.jsonl')
+        with open(dead, 'w') as fh:
+            fh.write(json.dumps(self.entry(self.member, 30)) + '\n')
+            fh.write(json.dumps(self.entry(self.other, 20)) + '\n')
+            fh.write('{"member_id": ')
+        with open(os.path.join(self.directory.name, '999999999.2.flushing'), 'w') as fh:
+            fh.write(json.dumps(self.entry(self.member, 30)) + '\n')
+
+        with self.assertLogs('gym.checkins', 'WARNING'):
+            self.assertEqual(checkins.recover_journals(self.directory.name), 2)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertEqual(checkins.recover_journals(self.directory.name), 0)
+        self.assertEqual(Attendance.objects.count(), 2)
+
+    def test_claimed_journals_are_left_to_a_live_claimer(self):
+        for claimer in (os.getppid(), 999999998):
+            with open(os.path.join(self.directory.name, f'999999999.{claimer}.flushing.recovering-{claimer}'), 'w') as fh:
+                fh.write(json.dumps(self.entry(self.member, claimer % 60)) + '\n')
+
+        self.assertEqual(checkins.recover_journals(self.directory.name), 1)
+        self.assertEqual(os.listdir(self.directory.name), [f'999999999.{os.getppid()}.flushing.recovering-{os.getppid()}'])
+
+    def test_failed_flush_keeps_entries_for_the_retry(self):
+        buffer = checkins.CheckInBuffer(self.directory.name, flush_interval=3600, fsync=False)
+        buffer.submit(self.member.pk)
+        with mock.patch.object(Attendance.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                buffer.flush()
+        self.assertEqual(Attendance.objects.count(), 0)
+        self.assertEqual(len(buffer.pending), 1)
+        self.assertEqual(os.listdir(self.directory.name), [f'{os.getpid()}.1.flushing'])
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+        buffer.submit(self.other.pk)
+        with mock.patch.object(Attendance.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                buffer.flush()
+        buffer.submit(self.member.pk, timezone.now() + timedelta(seconds=1))
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertEqual(Attendance.objects.count(), 3)
+
+    def test_inactive_members_cannot_check_themselves_in(self):
+        user = User.objects.create_user('ann', password='pw')
+        Member.objects.create(user=user, first_name='Ann', last_name='Lee', email='ann@example.com', phone='555-0100', is_active=False)
+        self.client.force_login(user)
+        with mock.patch.object(checkins, 'get_buffer') as get_buffer:
+            self.assertEqual(self.client.post(reverse('quick_check_in')).status_code, 403)
+        get_buffer.assert_not_called()
+
+
+class CalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get_month(self, **params):
+        response = self.client.get(reverse('gym_info'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_month_grid_places_events_and_special_hours(self):
+        GymEvent.objects.create(title='Open House', date=date(2026, 10, 14), start_time=time(10), end_time=time(12))
+        GymEvent.objects.create(title='Hidden', date=date(2026, 10, 14), start_time=time(10), end_time=time(12), is_active=False)
+        SpecialHours.objects.create(title='Closed', date=date(2026, 9, 28))
+        context = self.get_month(year=2026, month=10)
+
+        days = [day for week in context['calendar_weeks'] for day in week]
+        self.assertEqual((context['month_name'], context['year']), ('October', 2026))
+        self.assertTrue(all(len(week) == 7 for week in context['calendar_weeks']))
+        self.assertEqual((days[0]['date'], days[-1]['date']), (date(2026, 9, 27), date(2026, 10, 31)))
+        self.assertEqual([day['date'].day for day in days if day['is_current_month']], list(range(1, 32)))
+        by_date = {day['date']: day for day in days}
+        self.assertEqual([event.title for event in by_date[date(2026, 10, 14)]['events']], ['Open House'])
+        self.assertEqual(by_date[date(2026, 9, 28)]['special'].title, 'Closed')
+        self.assertEqual(sum(day['is_today'] for day in days), int(date(2026, 9, 27) <= date.today() <= date(2026, 10, 31)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GymEvent.objects.create(title='Late Addition', date=date(2026, 10, 20), start_time=time(18), end_time=time(19))
+        days = [day for week in self.get_month(year=2026, month=10)['calendar_weeks'] for day in week]
+        self.assertEqual(sum(len(day['events']) for day in days), 2)
+
+    def test_navigation_wraps_around_the_year(self):
+        context = self.get_month(year=2026, month=1)
+        self.assertEqual((context['prev_month'], context['next_month']), (date(2025, 12, 1), date(2026, 2, 1)))
+        context = self.get_month(year=2026, month=12)
+        self.assertEqual((context['prev_month'], context['next_month']), (date(2026, 11, 1), date(2027, 1, 1)))
+        self.assertContains(self.client.get(reverse('gym_info'), {'year': 2026, 'month': 12}), '?year=2027&month=1"')
+
+    def test_invalid_months_fall_back_to_the_current_one(self):
+        today = date.today()
+        for params in [{'year': 'abc'}, {'month': '13'}, {'month': '0'}, {'year': '1', 'month': '1'}, {'year': '9999', 'month': '12'}]:
+            with self.subTest(**params):
+                context = self.get_month(**params)
+                self.assertEqual((context['year'], context['month_name']), (today.year, calendar.month_name[today.month]))
+                self.assertTrue(context['is_current_month'])
+
+
+class MemberImportTests(TestCase):
+    def test_round_trip_matches_emails_and_keeps_join_dates(self):
+        joined = timezone.now() - timedelta(days=90)
+        member = Member.objects.create(first_name='Ann', last_name='Lee', email='Ann.Lee@Example.com', phone='555-0100', date_joined=joined)
+        self.assertEqual(member.email, 'ann.lee@example.com')
+        Attendance.objects.create(member=member)
+
+        with tempfile.TemporaryDirectory() as directory:
+            members, attendance, update = (os.path.join(directory, name) for name in ['m.csv', 'a.csv', 'u.csv'])
+            call_command('export_members', members, stderr=StringIO())
+            call_command('export_attendance', attendance, stderr=StringIO())
+            with open(update, 'w') as fh:
+                fh.write('email,first_name,last_name\nANN.LEE@example.com,Annie,Lee\n')
+            for command, path in [('import_members', members), ('import_members', update), ('import_attendance', attendance)]:
+                call_command(command, path, stderr=StringIO())
+
+        member.refresh_from_db()
+        self.assertEqual(Member.objects.count(), 1)
+        self.assertEqual(member.first_name, 'Annie')
+        self.assertEqual(member.date_joined, joined)
+        self.assertEqual(member.attendance_records.count(), 1)
+
+
+    def test_email_migration_matches_normalize_email(self):
+        migration = importlib.import_module('gym.migrations.0020_lowercase_member_emails')
+        ann, bob, clash = make_members(3)
+        for member, email in [(ann, ' Ann@Example.com'), (bob, 'bob@example.com\t'), (clash, 'BOB@example.com')]:
+            Member.objects.filter(pk=member.pk).update(email=email)
+
+        migration.lowercase_emails(django_apps, mock.Mock(connection=connection))
+        emails = dict(Member.objects.values_list('pk', 'email'))
+        self.assertEqual(
+            [emails[ann.pk], emails[bob.pk], emails[clash.pk]],
+            ['ann@example.com', 'bob@example.com', 'BOB@example.com'],
+        )
+
+
+class PageCacheTests(TestCase):
+    def test_pages_expire_only_once_the_write_commits(self):
+        before = pagecache.model_versions([Member])
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.objects.create(first_name='Ann', last_name='Lee', email='ann@example.com', phone='555-0100')
+            self.assertEqual(pagecache.model_versions([Member]), before)
+        self.assertNotEqual(pagecache.model_versions([Member]), before)
+
+
+class StatsTests(TestCase):
+    def setUp(self):
+        stats.flush_counts()
+        cache.clear()
+
+    def test_writes_invalidate_cached_aggregates(self):
+        alice, bob = make_members(2)
+        gym_class = make_class()
+        self.assertEqual((stats.active_member_count(), stats.active_class_count()), (2, 1))
+
+        Member.objects.create(first_name='Ann', last_name='Lee', email='ann@example.com', phone='555-0100')
+        self.assertEqual(stats.active_member_count(), 3)
+        alice.is_active = False
+        alice.save()
+        self.assertEqual(stats.active_member_count(), 2)
+        self.assertNotIn(alice, stats.recent_members())
+        gym_class.delete()
+        self.assertEqual(stats.active_class_count(), 0)
+
+    def test_hits_and_misses_are_reported(self):
+        for _ in range(3):
+            stats.active_class_count()
+        out = StringIO()
+        call_command('cache_stats', stdout=out)
+        self.assertEqual(out.getvalue().split('\n')[:3], ['Hits: 2', 'Misses: 1', 'Hit rate: 66.7%'])
+
+
+class MemberPaginationTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        # Two members share a join date, so the id breaks the tie.
+        Member.objects.bulk_create([
+            Member(first_name='Member', last_name=str(i), email=f'member{i}@example.com', phone='555-0100',
+                   date_joined=now - timedelta(days=min(i, 5)), membership_type='premium' if i % 2 else 'basic')
+            for i in range(7)
+        ])
+        self.newest_first = list(Member.objects.order_by('-date_joined', '-pk'))
+
+    def test_cursors_round_trip_and_tampering_is_ignored(self):
+        member = self.newest_first[0]
+        cursor = pagination.encode_cursor(member.date_joined, member.pk)
+        self.assertEqual(pagination.decode_cursor(cursor), (member.date_joined, member.pk))
+        for tampered in ['not a cursor!', cursor[:-3], base64.urlsafe_b64encode(b'yesterday|1').decode(), base64.urlsafe_b64encode(b'\xff\xfe').decode()]:
+            with self.subTest(cursor=tampered):
+                self.assertIsNone(pagination.decode_cursor(tampered))
+        page = pagination.paginate_by_date_joined(Member.objects.all(), 'not a cursor!', per_page=3)
+        self.assertEqual(list(page), self.newest_first[:3])
+
+    def test_next_and_previous_pages(self):
+        pages, page = [], pagination.paginate_by_date_joined(Member.objects.all(), per_page=3)
+        self.assertFalse(page.has_previous)
+        while True:
+            pages.append(list(page))
+            if not page.has_next:
+                break
+            page = pagination.paginate_by_date_joined(Member.objects.all(), page.next_cursor, per_page=3)
+        self.assertEqual(sum(pages, []), self.newest_first)
+
+        for expected in reversed(pages[:-1]):
+            page = pagination.paginate_by_date_joined(Member.objects.all(), per_page=3, before=page.previous_cursor)
+            self.assertEqual(list(page), expected)
+        self.assertFalse(page.has_previous)
+        self.assertEqual(page.next_cursor, pagination.encode_cursor(expected[-1].date_joined, expected[-1].pk))
+
+    def test_filtered_total_is_cached_until_members_change(self):
+        cache.clear()
+        response = self.client.get(reverse('member_list'), {'type': 'premium'})
+        self.assertEqual(response.context['total_members'], 3)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('member_list'), {'type': 'premium'})
+        Member.objects.create(first_name='Ann', last_name='Lee', email='ann@example.com', phone='555-0100', membership_type='premium')
+        self.assertEqual(self.client.get(reverse('member_list'), {'type': 'premium'}).context['total_members'], 4)
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        for name in ['Cycle', 'Pilates', 'Yoga']:
+            make_class(name=name)
+
+    def test_pages_link_to_the_next_one(self):
+        response = self.client.get(reverse('api_classes'), {'page_size': 2})
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Cycle', 'Pilates'])
+        response = self.client.get(response.json()['next'])
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Yoga'])
+        self.assertIsNone(response.json()['next'])
+        self.assertEqual(len(self.client.get(reverse('api_classes'), {'page': 'x'}).json()['results']), 3)
+
+    def test_matching_etag_is_answered_without_queries(self):
+        etag = self.client.get(reverse('api_classes'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('api_classes'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_class(name='Boxing')
+        response = self.client.get(reverse('api_classes'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['results']), 4)
+
+
+class InstructorPhotoTests(TestCase):
+    def test_uploads_are_refused_without_pillow(self):
+        upload = SimpleUploadedFile('sam.jpg', b'not really a jpeg', content_type='image/jpeg')
+        with mock.patch.object(photos, 'available', return_value=False):
+            form = InstructorAdminForm(data={'name': 'Sam', 'specialty': 'Yoga', 'bio': ''}, files={'photo_upload': upload})
+            self.assertIn('photo_upload', form.errors)
+            self.assertEqual([warning.id for warning in checks.check_pillow(None)], ['gym.W001'])
+
+
+class SystemCheckTests(TestCase):
+    def test_deploy_check_warns_without_an_asgi_server(self):
+        with mock.patch('importlib.util.find_spec', return_value=None):
+            self.assertEqual([warning.id for warning in checks.check_asgi_server(None)], ['gym.W002'])
+
+
+class LiveStreamTests(TestCase):
+    def test_sync_stream_sends_one_snapshot(self):
+        session = make_occurrence(capacity=5)
+        response = self.client.get(reverse('class_availability_stream'), {'sessions': str(session.pk)})
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith(f'retry: {live.SNAPSHOT_RETRY_MS}\n'))
+        self.assertIn(f'"id":{session.pk},"capacity":5,"taken":0,"spots":5', body)
+
+
+class MemberMiddlewareTests(TestCase):
+    async def test_async_requests_get_the_member(self):
+        self.assertTrue(iscoroutinefunction(MemberMiddleware(self.async_view)))
+        user = await User.objects.acreate_user('sam', password='pw')
+        member = await Member.objects.acreate(user=user, first_name='Sam', last_name='Lee', email='sam@example.com', phone='555-0100')
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.asgi_request.member, member)
+
+    async def async_view(self, request):
+        pass
+
+
+@override_settings(GYM_SQL_INSTRUMENTATION=True, GYM_SLOW_REQUEST_QUERIES=50, GYM_REPEATED_QUERY_THRESHOLD=3)
+class QueryInstrumentationTests(TestCase):
+    def test_server_timing_counts_the_queries(self):
+        def view(request):
+            Member.objects.count()
+            return HttpResponse()
+        response = QueryInstrumentationMiddleware(view)(RequestFactory().get('/'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[0-9.]+;desc="1 queries"$')
+
+    def test_repeated_statements_are_logged_with_their_call_site(self):
+        def view(request):
+            for member in make_members(3):
+                Member.objects.get(pk=member.pk)
+            return HttpResponse()
+        with self.assertLogs('gym.sql', 'WARNING') as logs:
+            QueryInstrumentationMiddleware(view)(RequestFactory().get('/members/'))
+        self.assertIn('GET /members/ (-): 4 queries', logs.output[0])
+        self.assertIn('most repeated x3 at gym/tests.py:', logs.output[0])
+
+    async def test_async_requests_are_counted_natively(self):
+        async def view(request):
+            await Member.objects.acount()
+            await GymClass.objects.acount()
+            return HttpResponse()
+        middleware = QueryInstrumentationMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().get('/'))
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+
+class StaticFilesMiddlewareTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        files = {
+            'app.0123abcd.css': b'body { color: red; }' * 50,
+            'app.0123abcd.css.gz': b'g' * 40,
+            'app.0123abcd.css.br': b'b' * 30,
+            'robots.txt': b'User-agent: *\n',
+            'staticfiles.json': json.dumps({'version': '1.1', 'paths': {'app.css': 'app.0123abcd.css'}}).encode(),
+        }
+        for name, content in files.items():
+            with open(os.path.join(directory.name, name), 'wb') as fh:
+                fh.write(content)
+        overrides = override_settings(GYM_SERVE_STATIC=True, STATIC_ROOT=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.middleware = StaticFilesMiddleware(lambda request: None)
+
+    def get(self, name, **headers):
+        return self.middleware(RequestFactory().get(f'/static/{name}', headers=headers))
+
+    def test_smallest_accepted_encoding_is_sent(self):
+        for accept, encoding, length in [('gzip, br', 'br', 30), ('gzip, br;q=0', 'gzip', 40), ('', None, 1000)]:
+            response = self.get('app.0123abcd.css', accept_encoding=accept)
+            self.assertEqual(response.get('Content-Encoding'), encoding)
+            self.assertEqual(len(b''.join(response.streaming_content)), length)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_fingerprinted_files_are_immutable(self):
+        self.assertEqual(self.get('app.0123abcd.css')['Cache-Control'], StaticFilesMiddleware.IMMUTABLE)
+        response = self.get('robots.txt')
+        self.assertEqual(response['Cache-Control'], StaticFilesMiddleware.REVALIDATE)
+        self.assertNotIn('Vary', response)
+        self.assertIsNone(self.get('staticfiles.json'))
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get('app.0123abcd.css', accept_encoding='gzip')['ETag']
+        response = self.get('app.0123abcd.css', accept_encoding='gzip', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], StaticFilesMiddleware.IMMUTABLE)
+        self.assertEqual(self.get('app.0123abcd.css', if_none_match=etag).status_code, 200)
+
+    async def test_async_requests_stream_without_the_sync_fallback(self):
+        async def get_response(request):
+            pass
+        middleware = StaticFilesMiddleware(get_response)
+        response = await middleware(AsyncRequestFactory().get('/static/robots.txt'))
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'User-agent: *\n')
+
+
+class SqliteProfileTests(SimpleTestCase):
+    # Outside a transaction, so the router can be seen choosing the alias.
+    databases = {DEFAULT_DB_ALIAS}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'gym.sqlite3')
+
+    def connect(self, alias, name, **options):
+        settings_dict = {**connection.settings_dict, 'NAME': name, 'CONN_MAX_AGE': 0, 'OPTIONS': options}
+        wrapper = SQLiteDatabaseWrapper(settings_dict, alias)
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(GYM_SQLITE_PRAGMAS=settings.GYM_SQLITE_PRODUCTION_PRAGMAS)
+    def test_production_pragmas_apply_to_each_new_connection(self):
+        for _ in range(2):
+            writer = self.connect(DEFAULT_DB_ALIAS, self.path)
+            self.assertEqual(
+                [self.pragma(writer, name) for name in ['journal_mode', 'synchronous', 'busy_timeout', 'temp_store', 'cache_size']],
+                ['wal', 1, 5000, 2, -64000],
+            )
+            self.assertEqual(self.pragma(writer, 'query_only'), 0)
+            writer.close()
+
+        with self.connect(DEFAULT_DB_ALIAS, self.path).cursor() as cursor:
+            cursor.execute('CREATE TABLE visit (id INTEGER PRIMARY KEY)')
+        reader = self.connect(db.READ_ONLY_DATABASE, f'file:{self.path}?mode=ro', uri=True)
+        self.assertEqual(self.pragma(reader, 'query_only'), 1)
+        with self.assertRaises(OperationalError), reader.cursor() as cursor:
+            cursor.execute('INSERT INTO visit DEFAULT VALUES')
+
+    def test_read_only_views_read_from_the_read_only_alias(self):
+        router = db.ReadOnlyViewRouter()
+
+        @db.read_only_view
+        def view(request):
+            return router.db_for_read(Member), router.db_for_write(Member)
+
+        with mock.patch.dict(connections.settings, {db.READ_ONLY_DATABASE: connection.settings_dict}):
+            self.assertEqual(view(RequestFactory().get('/')), (db.READ_ONLY_DATABASE, DEFAULT_DB_ALIAS))
+            self.assertEqual(view(RequestFactory().post('/')), (None, DEFAULT_DB_ALIAS))
+            self.assertIsNone(router.db_for_read(Member))
+        self.assertEqual(view(RequestFactory().get('/')), (None, DEFAULT_DB_ALIAS))
+        self.assertFalse(router.allow_migrate(db.READ_ONLY_DATABASE, 'gym'))
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        if not search.enabled():
+            self.skipTest('needs SQLite with FTS5')
+        self.instructor = Instructor.objects.create(name='Sarah Johnson', specialty='Yoga', bio='')
+        self.member = Member.objects.create(first_name='Zoë', last_name='Smith', email='zsmith@example.com', phone='555-0101')
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(search.autocomplete('zoe smi'), [{'kind': 'member', 'id': self.member.pk, 'label': 'Zoë Smith'}])
+        self.assertEqual([r['kind'] for r in search.autocomplete('yog')], ['instructor'])
+
+        self.member.last_name = 'Jones'
+        self.member.save()
+        self.assertEqual(search.autocomplete('smith'), [])
+        self.assertEqual(len(search.autocomplete('jones')), 1)
+
+        self.member.is_active = False
+        self.member.save()
+        self.assertEqual(search.autocomplete('jones'), [])
+        self.instructor.delete()
+        self.assertEqual(search.autocomplete('sarah'), [])
+
+    def test_admin_search_and_rebuild(self):
+        make_members(3)
+        admin = User.objects.create_superuser('admin', password='pw')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:gym_member_changelist'), {'q': 'member'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        response = self.client.get(reverse('admin:gym_member_changelist'), {'q': 'member'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+        response = self.client.get(reverse('api_search'), {'q': 'zsm', 'kinds': 'member'})
+        self.assertEqual(response.json()['results'][0]['id'], self.member.pk)
+
+    def test_imported_batches_are_indexed_even_if_a_later_row_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'members.csv')
+            with open(path, 'w') as fh:
+                fh.write('first_name,last_name,email,membership_type\nQuinn,Doyle,quinn@example.com,basic\nBad,Row,bad@example.com,gold\n')
+            with self.assertRaises(CommandError):
+                call_command('import_members', path, '--batch-size', '1', stderr=StringIO())
+        self.assertEqual([r['label'] for r in search.autocomplete('quinn')], ['Quinn Doyle'])
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.member, self.other = make_members(2)
+        now = timezone.now()
+        for days in [1, 100, 400, 500, 600]:
+            Attendance.objects.create(member=self.member, check_in_time=now - timedelta(days=days))
+        Attendance.objects.create(member=self.other, check_in_time=now - timedelta(days=700))
+
+    def rollups(self):
+        return (
+            sorted(HourlyVisits.objects.filter(visits__gt=0).values_list('date', 'hour', 'visits')),
+            sorted(MemberMonthlyVisits.objects.filter(visits__gt=0).values_list('member', 'month', 'visits')),
+        )
+
+    def test_old_check_ins_move_in_batches_and_keep_counting(self):
+        before = self.rollups()
+        out = StringIO()
+        call_command('archive_attendance', '--older-than', '365', '--batch-size', '2', stdout=out)
+        self.assertIn('Archived 4', out.getvalue())
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertEqual(ArchivedAttendance.objects.count(), 4)
+        self.assertEqual(self.rollups(), before)
+
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(self.rollups(), before)
+        self.assertEqual(archive.archive(), 0)
+
+    def test_editing_a_check_in_moves_its_visit(self):
+        record = Attendance.objects.filter(member=self.other).get()
+        record.check_in_time -= timedelta(days=40, hours=3)
+        record.save()
+        before = self.rollups()
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(self.rollups(), before)
+
+    def test_history_includes_the_archive_when_asked(self):
+        archive.archive(timezone.now() - timedelta(days=365))
+        self.assertEqual(len(archive.history(self.member)), 2)
+        times = [row['check_in_time'] for row in archive.history(self.member, archived=True)]
+        self.assertEqual(len(times), 5)
+        self.assertEqual(times, sorted(times, reverse=True))
+
+        url = reverse('api_member_attendance', args=[self.member.pk])
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        response = self.client.get(url, {'archived': '1', 'page_size': 3})
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_export_includes_the_archive_when_asked(self):
+        before = self.rollups()
+        archive.archive(timezone.now() - timedelta(days=365))
+        with tempfile.TemporaryDirectory() as directory:
+            live_only, everything = os.path.join(directory, 'live.csv'), os.path.join(directory, 'all.csv')
+            call_command('export_attendance', live_only, stderr=StringIO())
+            call_command('export_attendance', everything, '--archived', stderr=StringIO())
+            with open(live_only) as fh:
+                self.assertEqual(len(fh.readlines()), 3)
+
+            out = StringIO()
+            call_command('import_attendance', everything, stderr=out)
+            self.assertIn('skipped 6 duplicates', out.getvalue())
+            Attendance.objects.all().delete()
+            ArchivedAttendance.objects.all().delete()
+            call_command('import_attendance', everything, stderr=StringIO())
+
+        self.assertEqual(Attendance.objects.count(), 6)
+        self.assertEqual(self.rollups(), before)
+
+
+class AdminChangelistTests(TestCase):
+    # User, first and last pk for the size estimate, capped count, rows,
+    # first and last date. The dates share a day, so no bucket between them
+    # needs probing.
+    QUERIES = 7
+    CHANGELISTS = ['member', 'classregistration', 'attendance', 'membermonthlyvisits']
+
+    def add_rows(self, session, count, offset):
+        members = Member.objects.bulk_create([
+            Member(first_name='Member', last_name=str(i), email=f'admin{i}@example.com', phone='555-0100')
+            for i in range(offset, offset + count)
+        ])
+        for member in members:
+            ClassRegistration.objects.create(member=member, gym_class=session.gym_class, occurrence=session)
+            Attendance.objects.create(member=member)
+
+    def test_changelists_run_a_fixed_number_of_queries(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        session = make_occurrence()
+        for count, offset in [(2, 0), (40, 2)]:
+            self.add_rows(session, count, offset)
+            for name in self.CHANGELISTS:
+                with self.subTest(changelist=name, rows=count + offset), self.assertNumQueries(self.QUERIES):
+                    response = self.client.get(reverse(f'admin:gym_{name}_changelist'))
+                self.assertEqual(response.status_code, 200)
+
+    def test_counts_follow_the_live_rows_and_requested_page(self):
+        members = make_members(30)
+        Member.objects.filter(pk__in=[m.pk for m in members[:10]]).delete()
+        self.assertEqual(estimated_row_count(Member, 'default'), 20)
+
+        paginator = EstimatedCountPaginator(Member.objects.filter(is_active=True).order_by('pk'), 3)
+        paginator.count_limit = 5
+        paginator.requested_page = 4
+        self.assertEqual(paginator.count, 16)
+        self.assertEqual(len(paginator.page(5)), 3)
+
+    def test_indexed_dates_match_distinct_dates(self):
+        member = make_members(1)[0]
+        now = timezone.now()
+        for days in [0, 1, 3, 40, 400]:
+            Attendance.objects.create(member=member, check_in_time=now - timedelta(days=days))
+        attendance = Attendance.objects.all()
+        for kind in ['year', 'month', 'day']:
+            with self.subTest(kind=kind):
+                expected = [value.date() for value in attendance.datetimes('check_in_time', kind)]
+                self.assertEqual(IndexedDates(attendance, 'check_in_time').datetimes('check_in_time', kind), expected)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    def test_parallel_registrations_never_oversell(self):
+        session = make_occurrence(capacity=15)
+        members = make_members(300)
+
+        def attempt(member):
+            try:
+                return reservations.reserve_seat(member, session)
+            except reservations.ClassFull:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(attempt, members))
+
+        self.assertEqual(sum(results), 15)
+        self.assertEqual(ClassRegistration.objects.filter(occurrence=session, is_cancelled=False).count(), 15)
+        session.refresh_from_db()
+        self.assertEqual(session.seats_taken, 15)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class QueryPlanTests(TestCase):
+    """Every query a view runs against a gym table must use an index."""
+
+    # Tables that views list in full on purpose.
+    FULL_SCAN_ALLOWED = {'gym_instructor'}
+    SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+    @classmethod
+    def setUpTestData(cls):
+        instructor = Instructor.objects.create(name='Sarah Johnson', specialty='Yoga', bio='Teaches yoga.')
+        cls.gym_class = make_class(instructor=instructor)
+        cls.session = make_occurrence(cls.gym_class, date=date.today())
+        members = make_members(5)
+        for member in members:
+            ClassRegistration.objects.create(member=member, gym_class=cls.gym_class, occurrence=cls.session)
+            Attendance.objects.create(member=member)
+        cls.member = members[0]
+        cls.member.user = User.objects.create_user('member', password='pw', is_staff=True)
+        cls.member.save()
+        today = date.today()
+        GymEvent.objects.create(title='Open House', date=today, start_time=time(10), end_time=time(12))
+        SpecialHours.objects.create(title='Holiday', date=today + timedelta(days=3))
+
+    def unindexed_scans(self, path):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+
+        scans = []
+        with connection.cursor() as cursor:
+            for sql, params in statements:
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    match = self.SCAN.match(detail)
+                    if (match and match.group(1).startswith('gym_') and 'USING' not in detail
+                            and match.group(1) not in self.FULL_SCAN_ALLOWED):
+                        scans.append(f'{detail}: {sql}')
+        return scans
+
+    def test_anonymous_views_use_indexes(self):
+        for path in [
+            reverse('home'),
+            reverse('member_list'),
+            reverse('member_list') + '?type=basic',
+            reverse('member_detail', args=[self.member.pk]),
+            reverse('class_schedule'),
+            reverse('class_detail', args=[self.gym_class.pk]),
+            reverse('gym_info'),
+            reverse('instructors'),
+        ]:
+            with self.subTest(path=path):
+                self.assertEqual(self.unindexed_scans(path), [])
+
+    def test_member_views_use_indexes(self):
+        self.client.force_login(self.member.user)
+        for path in [
+            reverse('dashboard'),
+            reverse('check_in'),
+            reverse('profile'),
+            reverse('class_register', args=[self.session.pk]),
+            reverse('occupancy_report'),
+        ]:
+            with self.subTest(path=path):
+                self.assertEqual(self.unindexed_scans(path), [])
@@ -1,20 +1,36 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, async_views, views
+
+# Under ASGI the read-heavy pages are served by their async versions.
+read_views = async_views if settings.GYM_ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('register/', views.register, name='register'),
     path('login/', auth_views.LoginView.as_view(template_name='gym/login.html'), name='login'),
     path('logout/', views.logout_view, name='logout'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', read_views.dashboard, name='dashboard'),
     path('members/', views.member_list, name='member_list'),
     path('members/<int:pk>/', views.member_detail, name='member_detail'),
-    path('classes/', views.class_schedule, name='class_schedule'),
-    path('classes/<int:pk>/', views.class_detail, name='class_detail'),
-    path('classes/<int:pk>/register/', views.class_register, name='class_register'),
+    path('classes/', read_views.class_schedule, name='class_schedule'),
+    path('classes/<int:pk>/', read_views.class_detail, name='class_detail'),
+    path('sessions/<int:pk>/register/', views.class_register, name='class_register'),
+    path('sessions/<int:pk>/waitlist/', views.class_waitlist, name='class_waitlist'),
+    path('sessions/<int:pk>/cancel/', views.class_cancel, name='class_cancel'),
     path('check-in/', views.check_in, name='check_in'),
+    path('check-in/quick/', views.quick_check_in, name='quick_check_in'),
     path('profile/', views.profile, name='profile'),
-    path('info/', views.gym_info, name='gym_info'),
-    path('instructors/', views.instructors, name='instructors'),
+    path('info/', read_views.gym_info, name='gym_info'),
+    path('instructors/', read_views.instructors, name='instructors'),
+    path('reports/occupancy/', views.occupancy_report, name='occupancy_report'),
+    path('classes/live/', read_views.class_availability_stream, name='class_availability_stream'),
+    path('api/classes/', api.classes, name='api_classes'),
+    path('api/schedule/', api.schedule, name='api_schedule'),
+    path('api/events/', api.events, name='api_events'),
+    path('api/special-hours/', api.special_hours, name='api_special_hours'),
+    path('api/instructors/', api.instructors, name='api_instructors'),
+    path('api/search/', api.search_autocomplete, name='api_search'),
+    path('api/members/<int:pk>/attendance/', api.member_attendance, name='api_member_attendance'),
 ]
@@ -1,18 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth import login, authenticate, logout as auth_logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import require_POST, require_safe
 from django.utils import timezone
-from .models import Member, GymClass, ClassRegistration, Attendance, GymEvent, SpecialHours, Instructor
+from .models import Member, GymClass, ClassOccurrence, ClassRegistration, Attendance, GymEvent, SpecialHours, Instructor
 from datetime import date, timedelta
 import calendar
+from . import calendars, checkins, live, reservations, rollups, stats
+from .db import read_only_view
 from .forms import MemberSignupForm, AttendanceForm, MemberRegistrationForm, ProfileForm
+from .pagecache import anonymous_page_cache
+from .pagination import paginate_by_date_joined
 
 
+REGULAR_HOURS = [
+    {'day': 'Monday - Friday', 'hours': '5:00 AM - 11:00 PM'},
+    {'day': 'Saturday', 'hours': '6:00 AM - 10:00 PM'},
+    {'day': 'Sunday', 'hours': '6:00 AM - 10:00 PM'},
+]
+
+
+@anonymous_page_cache(Member, GymClass)
+@read_only_view
 def home(request):
-    total_members = Member.objects.filter(is_active=True).count()
-    total_classes = GymClass.objects.filter(is_active=True).count()
-    recent_members = Member.objects.filter(is_active=True)[:5]
+    total_members = stats.active_member_count()
+    total_classes = stats.active_class_count()
+    recent_members = stats.recent_members()
     return render(request, 'gym/home.html', {
         'total_members': total_members,
         'total_classes': total_classes,
@@ -32,14 +48,32 @@ def member_signup(request):
     return render(request, 'gym/member_signup.html', {'form': form})
 
 
+MEMBER_LIST_FIELDS = ['first_name', 'last_name', 'email', 'phone', 'membership_type', 'date_joined']
+
+
+@read_only_view
 def member_list(request):
     members = Member.objects.filter(is_active=True)
-    return render(request, 'gym/member_list.html', {'members': members})
+    membership_type = request.GET.get('type')
+    if membership_type not in dict(Member.MEMBERSHIP_TYPES):
+        membership_type = None
+    if membership_type:
+        members = members.filter(membership_type=membership_type)
+    
+    page = paginate_by_date_joined(members.only(*MEMBER_LIST_FIELDS), request.GET.get('after'), before=request.GET.get('before'))
+    return render(request, 'gym/member_list.html', {
+        'members': page,
+        'total_members': stats.active_member_count_by_type(membership_type) if membership_type else stats.active_member_count(),
+        'membership_type': membership_type,
+        'membership_types': Member.MEMBERSHIP_TYPES,
+        'is_first_page': not page.has_previous,
+    })
 
 
+@read_only_view
 def member_detail(request, pk):
     member = get_object_or_404(Member, pk=pk)
-    registrations = member.registrations.filter(is_cancelled=False)
+    registrations = member.registrations.filter(is_cancelled=False).select_related('gym_class', 'occurrence')
     attendance = member.attendance_records.all()[:10]
     return render(request, 'gym/member_detail.html', {
         'member': member,
@@ -48,61 +82,133 @@ def member_detail(request, pk):
     })
 
 
+SCHEDULE_DAYS = 7
+UPCOMING_SESSIONS = 4
+
+
+def _week_sessions(today):
+    return ClassOccurrence.objects.upcoming().filter(
+        date__lt=today + timedelta(days=SCHEDULE_DAYS), gym_class__is_active=True,
+    ).select_related('gym_class__instructor')
+
+
+def _session_registrations(session):
+    if session is None:
+        return ClassRegistration.objects.none()
+    return session.registrations.filter(is_cancelled=False).select_related('member')
+
+
+@anonymous_page_cache(GymClass, Instructor, ClassOccurrence)
+@read_only_view
 def class_schedule(request):
-    classes = GymClass.objects.filter(is_active=True)
-    for gym_class in classes:
-        gym_class.instructor_obj = Instructor.objects.filter(name=gym_class.instructor).first()
-    return render(request, 'gym/class_schedule.html', {'classes': classes})
+    sessions = _week_sessions(timezone.localdate())
+    return render(request, 'gym/class_schedule.html', {'sessions': sessions})
 
 
+@read_only_view
 def class_detail(request, pk):
-    gym_class = get_object_or_404(GymClass, pk=pk)
-    gym_class.instructor_obj = Instructor.objects.filter(name=gym_class.instructor).first()
-    registrations = gym_class.registrations.filter(is_cancelled=False)
+    gym_class = get_object_or_404(GymClass.objects.select_related('instructor'), pk=pk)
+    sessions = list(gym_class.occurrences.upcoming()[:UPCOMING_SESSIONS])
+    next_session = sessions[0] if sessions else None
     return render(request, 'gym/class_detail.html', {
         'gym_class': gym_class,
-        'registrations': registrations,
+        'sessions': sessions,
+        'next_session': next_session,
+        'registrations': _session_registrations(next_session),
     })
 
 
 @login_required
 def class_register(request, pk):
-    gym_class = get_object_or_404(GymClass, pk=pk)
+    session = get_object_or_404(ClassOccurrence.objects.select_related('gym_class__instructor'), pk=pk)
+    gym_class = session.gym_class
     
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
+    member = request.member
+    if member is None:
         messages.error(request, 'No member profile found. Please contact support.')
         return redirect('dashboard')
     
     if request.method == 'POST':
         try:
-            registration = ClassRegistration.objects.get(member=member, gym_class=gym_class)
-            if registration.is_cancelled:
-                if gym_class.spots_available() > 0:
-                    registration.is_cancelled = False
-                    registration.save()
-                    messages.success(request, f'Successfully re-registered for {gym_class.name}!')
-                    return redirect('class_detail', pk=gym_class.pk)
-                else:
-                    messages.error(request, 'Sorry, this class is full.')
-            else:
-                messages.info(request, 'You are already registered for this class.')
-                return redirect('class_detail', pk=gym_class.pk)
-        except ClassRegistration.DoesNotExist:
-            if gym_class.spots_available() > 0:
-                ClassRegistration.objects.create(
-                    member=member,
-                    gym_class=gym_class,
-                    is_cancelled=False
-                )
-                messages.success(request, f'Successfully registered for {gym_class.name}!')
-                return redirect('class_detail', pk=gym_class.pk)
+            created = reservations.reserve_seat(member, session)
+        except reservations.AlreadyRegistered:
+            messages.info(request, 'You are already registered for this session.')
+            return redirect('class_detail', pk=gym_class.pk)
+        except reservations.OccurrenceClosed:
+            messages.error(request, 'This session is no longer open for registration.')
+            return redirect('class_detail', pk=gym_class.pk)
+        except reservations.ClassFull:
+            messages.error(request, 'Sorry, this session is full. You can join the waitlist below.')
+        else:
+            if created:
+                messages.success(request, f'Successfully registered for {gym_class.name} on {session.date:%b %d}!')
             else:
-                messages.error(request, 'Sorry, this class is full.')
+                messages.success(request, f'Successfully re-registered for {gym_class.name} on {session.date:%b %d}!')
+            return redirect('class_detail', pk=gym_class.pk)
+    
+    is_registered = ClassRegistration.objects.filter(member=member, occurrence=session, is_cancelled=False).exists()
+    waitlist_place = None if is_registered else reservations.waitlist_place(member, session)
+    return render(request, 'gym/class_register.html', {
+        'gym_class': gym_class,
+        'session': session,
+        'member': member,
+        'is_registered': is_registered,
+        'waitlist_place': waitlist_place,
+    })
+
+
+@login_required
+@require_POST
+def class_waitlist(request, pk):
+    session = get_object_or_404(ClassOccurrence.objects.select_related('gym_class'), pk=pk)
+    gym_class = session.gym_class
+    
+    member = request.member
+    if member is None:
+        messages.error(request, 'No member profile found. Please contact support.')
+        return redirect('dashboard')
+    
+    if request.POST.get('action') == 'leave':
+        if reservations.leave_waitlist(member, session):
+            messages.success(request, f'You have left the waitlist for {gym_class.name}.')
+        else:
+            messages.info(request, 'You are not on the waitlist for this session.')
+        return redirect('class_register', pk=session.pk)
+    
+    try:
+        place = reservations.join_waitlist(member, session)
+    except reservations.AlreadyRegistered:
+        messages.info(request, 'You are already registered for this session.')
+        return redirect('class_detail', pk=gym_class.pk)
+    except reservations.OccurrenceClosed:
+        messages.error(request, 'This session is no longer open for registration.')
+        return redirect('class_detail', pk=gym_class.pk)
+    except reservations.AlreadyWaitlisted:
+        messages.info(request, 'You are already on the waitlist for this session.')
+    else:
+        if place is None:
+            messages.success(request, f'A spot opened up - you are registered for {gym_class.name}!')
+            return redirect('class_detail', pk=gym_class.pk)
+        messages.success(request, f'You are #{place} on the waitlist for {gym_class.name}.')
+    return redirect('class_register', pk=session.pk)
+
+
+@login_required
+@require_POST
+def class_cancel(request, pk):
+    session = get_object_or_404(ClassOccurrence.objects.select_related('gym_class'), pk=pk)
+    gym_class = session.gym_class
+    
+    member = request.member
+    if member is None:
+        messages.error(request, 'No member profile found. Please contact support.')
+        return redirect('dashboard')
     
-    is_registered = ClassRegistration.objects.filter(member=member, gym_class=gym_class, is_cancelled=False).exists()
-    return render(request, 'gym/class_register.html', {'gym_class': gym_class, 'member': member, 'is_registered': is_registered})
+    if reservations.cancel_seat(member, session):
+        messages.success(request, f'Your registration for {gym_class.name} on {session.date:%b %d} has been cancelled.')
+    else:
+        messages.info(request, 'You are not registered for this session.')
+    return redirect('class_detail', pk=gym_class.pk)
 
 
 def register(request):
@@ -125,17 +231,19 @@ def register(request):
     return render(request, 'gym/register.html', {'form': form})
 
 
+def _upcoming_registrations(member):
+    return member.registrations.filter(
+        is_cancelled=False, occurrence__is_cancelled=False, occurrence__date__gte=timezone.localdate(),
+    ).select_related('occurrence__gym_class').order_by('occurrence__date', 'occurrence__start_time')
+
+
 @login_required
 def dashboard(request):
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
-        member = None
-    
-    classes = GymClass.objects.filter(is_active=True)[:6]
+    member = request.member
+    classes = stats.dashboard_classes()
     
     if member:
-        registrations = member.registrations.filter(is_cancelled=False)[:5]
+        registrations = _upcoming_registrations(member)[:5]
         recent_checkins = member.attendance_records.all()[:5]
     else:
         registrations = []
@@ -151,13 +259,15 @@ def dashboard(request):
 
 @login_required
 def check_in(request):
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
+    member = request.member
+    if member is None:
         messages.error(request, 'No member profile found. Please contact support.')
         return redirect('dashboard')
     
     if request.method == 'POST':
+        if not member.is_active:
+            messages.error(request, 'Your membership is not active. Please contact the front desk.')
+            return redirect('dashboard')
         Attendance.objects.create(member=member)
         messages.success(request, f'Welcome {member.first_name}! Checked in successfully.')
         return redirect('dashboard')
@@ -169,11 +279,35 @@ def check_in(request):
     })
 
 
+@login_required
+@require_POST
+def quick_check_in(request):
+    # Staff at the front desk may check in any member by email; everyone
+    # else checks themselves in.
+    member = request.member
+    if request.user.is_staff and request.POST.get('email'):
+        form = AttendanceForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'error': form.errors}, status=400)
+        member = Member.objects.filter(email=Member.normalize_email(form.cleaned_data['email']), is_active=True).only('pk', 'first_name', 'is_active').first()
+    
+    if member is None:
+        return JsonResponse({'error': 'No member profile found.'}, status=404)
+    if not member.is_active:
+        return JsonResponse({'error': 'This membership is not active.'}, status=403)
+    
+    entry = checkins.get_buffer().submit(member.pk)
+    return JsonResponse({
+        'status': 'accepted',
+        'member': member.first_name,
+        'check_in_time': entry['check_in_time'],
+    }, status=202)
+
+
 @login_required
 def profile(request):
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
+    member = request.member
+    if member is None:
         messages.error(request, 'No member profile found. Please contact support.')
         return redirect('dashboard')
     
@@ -196,46 +330,30 @@ def profile(request):
     })
 
 
+@anonymous_page_cache(GymEvent, SpecialHours)
+@read_only_view
 def gym_info(request):
     today = date.today()
-    year = today.year
-    month = today.month
+    year, month = calendars.parse_month(request.GET, today)
+    prev_month, next_month = calendars.adjacent_months(year, month)
     
     upcoming_events = GymEvent.objects.filter(date__gte=today, is_active=True)[:10]
     special_hours = SpecialHours.objects.filter(date__gte=today)[:10]
     
-    cal = calendar.Calendar(firstweekday=6)
-    month_days = cal.monthdatescalendar(year, month)
-    
-    calendar_weeks = []
-    for week in month_days:
-        week_days = []
-        for day in week:
-            day_info = {
-                'date': day,
-                'is_today': day == today,
-                'is_current_month': day.month == month,
-                'events': GymEvent.objects.filter(date=day, is_active=True),
-                'special': SpecialHours.objects.filter(date=day).first(),
-            }
-            week_days.append(day_info)
-        calendar_weeks.append(week_days)
+    calendar_weeks = calendars.get_month(year, month, today)
     
     month_name = calendar.month_name[month]
     
-    regular_hours = [
-        {'day': 'Monday - Friday', 'hours': '5:00 AM - 11:00 PM'},
-        {'day': 'Saturday', 'hours': '6:00 AM - 10:00 PM'},
-        {'day': 'Sunday', 'hours': '6:00 AM - 10:00 PM'},
-    ]
-    
     return render(request, 'gym/gym_info.html', {
         'upcoming_events': upcoming_events,
         'special_hours': special_hours,
         'calendar_weeks': calendar_weeks,
         'month_name': month_name,
         'year': year,
-        'regular_hours': regular_hours,
+        'prev_month': prev_month,
+        'next_month': next_month,
+        'is_current_month': (year, month) == (today.year, today.month),
+        'regular_hours': REGULAR_HOURS,
     })
 
 
@@ -245,6 +363,59 @@ def logout_view(request):
     return redirect('home')
 
 
+@anonymous_page_cache(Instructor)
+@read_only_view
 def instructors(request):
     instructors_list = Instructor.objects.all()
     return render(request, 'gym/instructors.html', {'instructors': instructors_list})
+
+
+@staff_member_required
+@read_only_view
+def occupancy_report(request):
+    try:
+        days = max(1, min(int(request.GET.get('days', 365)), 3660))
+    except ValueError:
+        days = 365
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    
+    heatmap = rollups.weekday_hour_heatmap(start, end)
+    busiest = max(heatmap.values(), default=0)
+    rows = []
+    for weekday, day_name in GymClass.WEEKDAYS:
+        cells = []
+        for hour in range(24):
+            visits = heatmap.get((weekday, hour), 0)
+            cells.append({
+                'hour': hour,
+                'visits': visits,
+                'intensity': f'{visits / busiest:.2f}' if busiest else '0',
+            })
+        rows.append({'day': day_name, 'cells': cells})
+    
+    return render(request, 'gym/occupancy_report.html', {
+        'rows': rows,
+        'hours': range(24),
+        'start': start,
+        'end': end,
+        'days': days,
+        'total_visits': sum(heatmap.values()),
+    })
+
+
+def _event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_safe
+def class_availability_stream(request):
+    # Holding the stream open would tie up a worker per open tab, so this
+    # sends one snapshot; under ASGI the async version streams instead.
+    class_ids = live.parse_class_ids(request.GET.get('sessions', ''))
+    events = [live.stream_preamble(live.SNAPSHOT_RETRY_MS)]
+    events += [live.format_event(payload) for payload in live.availability(class_ids).values()]
+    return _event_stream_response(events)
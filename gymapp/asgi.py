@@ -2,6 +2,23 @@
 ASGI config for gymapp project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serving through ASGI switches the read-heavy pages (home, class schedule
+and detail, instructors, gym info, dashboard) to their async versions in
+``gym.async_views``.
+
+An ASGI server is not among the project's dependencies; install one first
+(``manage.py check --deploy`` warns, gym.W002, if none is found).
+Deployment with uvicorn workers under gunicorn (``pip install uvicorn``)::
+
+    GYM_DB_PROFILE=production gunicorn gymapp.asgi:application \
+        -k uvicorn.workers.UvicornWorker --workers 4 --bind 0.0.0.0:8000
+
+or uvicorn on its own::
+
+    uvicorn gymapp.asgi:application --workers 4 --host 0.0.0.0 --port 8000
+
+``python -m benchmarks.asgi`` compares requests per process against the
+sync WSGI deployment.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +29,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gymapp.settings')
+os.environ.setdefault('GYM_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
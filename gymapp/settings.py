@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,15 +49,28 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gym.middleware.StaticFilesMiddleware',
+    'gym.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'gym.middleware.MemberMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL instrumentation (Server-Timing header and slow request
+# log). Off unless GYM_SQL_INSTRUMENTATION=1.
+GYM_SQL_INSTRUMENTATION = os.environ.get('GYM_SQL_INSTRUMENTATION') == '1'
+GYM_SLOW_REQUEST_QUERIES = int(os.environ.get('GYM_SLOW_REQUEST_QUERIES', 50))
+GYM_SLOW_REQUEST_DB_MS = int(os.environ.get('GYM_SLOW_REQUEST_DB_MS', 200))
+
+# Serve the read-heavy views from gym.async_views. gymapp.asgi turns this
+# on; WSGI deployments keep the sync views.
+GYM_ASYNC_VIEWS = os.environ.get('GYM_ASYNC_VIEWS') == '1'
+
 ROOT_URLCONF = 'gymapp.urls'
 
 TEMPLATES = [
@@ -79,13 +94,79 @@ WSGI_APPLICATION = 'gymapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+SQLITE_PATH = Path(os.environ.get('GYM_SQLITE_PATH', BASE_DIR / 'db.sqlite3'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': SQLITE_PATH,
+        # A file-backed test database lets concurrent tests rely on SQLite's
+        # busy timeout; the shared-cache in-memory default fails fast instead.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# Production SQLite profile (GYM_DB_PROFILE=production): WAL and tuned
+# pragmas (applied by gym.db.configure_sqlite), persistent connections,
+# BEGIN IMMEDIATE writes, and a read-only connection that read-only views
+# use through gym.db.ReadOnlyViewRouter.
+GYM_DB_PROFILE = os.environ.get('GYM_DB_PROFILE', 'development')
+GYM_SQLITE_PRAGMAS = {}
+GYM_SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+}
+
+if GYM_DB_PROFILE == 'production':
+    GYM_SQLITE_PRAGMAS = GYM_SQLITE_PRODUCTION_PRAGMAS
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
+    })
+    DATABASES['readonly'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{SQLITE_PATH}?mode=ro',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'uri': True,
+            'timeout': 5,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    DATABASE_ROUTERS = ['gym.db.ReadOnlyViewRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# A file-based cache is shared by every gunicorn worker on the host, so
+# signal-driven invalidation in one worker is seen by all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('GYM_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('GYM_CACHE_LOCATION', str(BASE_DIR / '.django_cache')),
+        'TIMEOUT': 60 * 60,
     }
 }
 
+# Tests get a private in-memory cache, so page, stats and session entries
+# never leak between test runs and the development server.
+if sys.argv[1:2] == ['test']:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,11 +206,58 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Production static profile (GYM_STATIC_PROFILE=production): collectstatic
+# writes fingerprinted names plus .gz/.br copies (gym.staticfiles), and
+# gym.middleware.StaticFilesMiddleware serves them from STATIC_ROOT, so no
+# separate web server is needed. Run collectstatic before starting workers.
+GYM_STATIC_PROFILE = os.environ.get('GYM_STATIC_PROFILE', 'development')
+
+if GYM_STATIC_PROFILE == 'production':
+    STORAGES['staticfiles'] = {'BACKEND': 'gym.staticfiles.CompressedManifestStaticFilesStorage'}
+
+GYM_SERVE_STATIC = os.environ.get('GYM_SERVE_STATIC', '1' if GYM_STATIC_PROFILE == 'production' else '0') == '1'
+
+# Uploaded instructor photos and their generated variants (gym.photos)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.environ.get('GYM_MEDIA_ROOT', str(BASE_DIR / 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Buffered check-in ingestion (gym.checkins)
+GYM_CHECKIN_JOURNAL_DIR = os.environ.get('GYM_CHECKIN_JOURNAL_DIR', str(BASE_DIR / 'var' / 'checkins'))
+GYM_CHECKIN_BATCH_SIZE = int(os.environ.get('GYM_CHECKIN_BATCH_SIZE', 200))
+GYM_CHECKIN_FLUSH_INTERVAL = float(os.environ.get('GYM_CHECKIN_FLUSH_INTERVAL', 1.0))
+GYM_CHECKIN_FSYNC = os.environ.get('GYM_CHECKIN_FSYNC', '1') == '1'
+
+# Dated class sessions (gym.occurrences): how many weeks ahead
+# `manage.py generate_occurrences` keeps sessions open for booking. Run it
+# daily so the horizon keeps rolling forward.
+GYM_OCCURRENCE_WEEKS = int(os.environ.get('GYM_OCCURRENCE_WEEKS', 4))
+
+# Attendance retention (gym.archive): `manage.py archive_attendance` moves
+# check-ins older than this many days to the archive table, a batch per
+# transaction. Schedule it nightly.
+GYM_ATTENDANCE_RETENTION_DAYS = int(os.environ.get('GYM_ATTENDANCE_RETENTION_DAYS', 365))
+GYM_ARCHIVE_BATCH_SIZE = int(os.environ.get('GYM_ARCHIVE_BATCH_SIZE', 1000))
+
+# Authentication and sessions
+# Users are loaded together with their Member (request.member). Sessions
+# are read from the shared cache and written through to the database.
+# Flash messages travel in a signed cookie, so showing one doesn't rewrite
+# the session. GYM_SESSION_ENGINE can select signed cookies instead
+# (django.contrib.sessions.backends.signed_cookies).
+AUTHENTICATION_BACKENDS = ['gym.auth.MemberModelBackend']
+SESSION_ENGINE = os.environ.get('GYM_SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
 LOGIN_URL = 'login'
@@ -14,10 +14,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from gym import photos
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", photos.serve, name='media'),
     path('', include('gym.urls')),
 ]
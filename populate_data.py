@@ -4,7 +4,8 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gymapp.settings')
 django.setup()
 
-from gym.models import Member, GymClass
+from gym import occurrences, search
+from gym.models import Member, GymClass, Instructor
 from datetime import time
 
 print("Creating sample gym classes...")
@@ -84,6 +85,26 @@ classes_data = [
     }
 ]
 
+print("Linking instructors...")
+
+names = {class_data['instructor'] for class_data in classes_data}
+instructors = {instructor.name: instructor for instructor in Instructor.objects.filter(name__in=names)}
+missing = {}
+for class_data in classes_data:
+    if class_data['instructor'] not in instructors:
+        missing.setdefault(class_data['instructor'], Instructor(
+            name=class_data['instructor'],
+            specialty=class_data['name'],
+            bio=f"Leads {class_data['name']} at GymPlace.",
+        ))
+for instructor in Instructor.objects.bulk_create(missing.values()):
+    search.index(instructor)
+    instructors[instructor.name] = instructor
+    print(f"✓ Created instructor: {instructor.name}")
+
+for class_data in classes_data:
+    class_data['instructor'] = instructors[class_data['instructor']]
+
 for class_data in classes_data:
     gym_class, created = GymClass.objects.get_or_create(
         name=class_data['name'],
@@ -96,6 +117,7 @@ for class_data in classes_data:
         print(f"- Already exists: {gym_class.name}")
 
 print(f"\nTotal classes in database: {GymClass.objects.count()}")
+print(f"Class sessions created for the coming weeks: {occurrences.generate()}")
 print("\nSample data populated successfully!")
 print("\nYou can now:")
 print("1. Visit the home page to see the gym app")